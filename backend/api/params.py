@@ -0,0 +1,9 @@
+"""Shared query parameter parsing for the API routes."""
+from typing import List, Optional
+
+
+def split_list(value: Optional[str]) -> Optional[List[str]]:
+    """Split a comma-separated query value ("VER,HAM") into items; None if unset."""
+    if value is None:
+        return None
+    return [item.strip() for item in value.split(",") if item.strip()]
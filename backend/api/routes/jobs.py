@@ -0,0 +1,42 @@
+"""Background precompute job API endpoints."""
+from fastapi import APIRouter, HTTPException
+from services.jobs import get_job_manager
+from models.schemas import JobRequest, JobStatus
+
+router = APIRouter(prefix="/jobs", tags=["jobs"])
+
+
+@router.post("", status_code=202, response_model=JobStatus)
+async def create_job(request: JobRequest):
+    """
+    Enqueue a background computation for a session artifact.
+
+    Returns the job (or the already queued/running job for the same work).
+    Poll `GET /jobs/{job_id}` until its status is `done`, then the normal
+    data endpoints answer from cache.
+
+    - **year**: Season year (e.g., 2024)
+    - **round_number**: Round number (1-24)
+    - **session_type**: 'R'/'S' for race_telemetry, 'Q'/'SQ' for quali_telemetry
+    - **artifact**: 'race_telemetry' or 'quali_telemetry'
+    """
+    try:
+        job = get_job_manager().submit(
+            request.year, request.round_number, request.session_type, request.artifact
+        )
+        return job.to_dict()
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/{job_id}", response_model=JobStatus)
+async def get_job(job_id: str):
+    """
+    Get the status of a precompute job: queued, running, done or failed.
+
+    - **job_id**: Id returned when the job was created
+    """
+    job = get_job_manager().get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    return job
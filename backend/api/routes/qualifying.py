@@ -1,6 +1,10 @@
 """Qualifying session API endpoints."""
-from fastapi import APIRouter, HTTPException
+import asyncio
+from typing import Optional
+from fastapi import APIRouter, HTTPException, Query
 from services.f1_data_service import get_f1_service
+from services.executor import get_executor
+from api.params import split_list
 from models.schemas import QualifyingResultsResponse, QualifyingTelemetryResponse
 
 router = APIRouter(prefix="/qualifying", tags=["qualifying"])
@@ -10,7 +14,9 @@ router = APIRouter(prefix="/qualifying", tags=["qualifying"])
 async def get_qualifying_results(
     year: int,
     round_number: int,
-    session_type: str = "Q"
+    session_type: str = "Q",
+    drivers: Optional[str] = Query(None, description="Comma-separated driver codes, e.g. VER,HAM"),
+    fields: Optional[str] = Query(None, description="Comma-separated telemetry fields, e.g. x,y,speed")
 ):
     """
     Get qualifying session results with lap times for Q1/Q2/Q3.
@@ -18,11 +24,20 @@ async def get_qualifying_results(
     - **year**: Season year (e.g., 2024)
     - **round_number**: Round number (1-24)
     - **session_type**: Session type ('Q' for Qualifying, 'SQ' for Sprint Qualifying)
+    - **drivers**: Only include telemetry for these drivers (default: all)
+    - **fields**: Only include these telemetry fields in each frame (default: all)
     """
     try:
         service = get_f1_service()
-        data = service.get_qualifying_results(year, round_number, session_type)
+        data = await get_executor().run(
+            service.get_qualifying_results, year, round_number, session_type,
+            split_list(drivers), split_list(fields)
+        )
         return data
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=504, detail="Timed out computing qualifying results, try again shortly")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching qualifying results: {str(e)}")
 
@@ -33,7 +48,8 @@ async def get_driver_qualifying_telemetry(
     round_number: int,
     driver_code: str,
     segment: str,
-    session_type: str = "Q"
+    session_type: str = "Q",
+    fields: Optional[str] = Query(None, description="Comma-separated telemetry fields, e.g. x,y,speed")
 ):
     """
     Get telemetry for a specific driver's qualifying lap.
@@ -43,11 +59,14 @@ async def get_driver_qualifying_telemetry(
     - **driver_code**: Driver code (e.g., 'VER', 'HAM')
     - **segment**: Qualifying segment ('Q1', 'Q2', or 'Q3')
     - **session_type**: Session type ('Q' for Qualifying, 'SQ' for Sprint Qualifying)
+    - **fields**: Only include these telemetry fields in each frame (default: all)
     """
     try:
         service = get_f1_service()
-        data = service.get_driver_qualifying_telemetry(
-            year, round_number, driver_code, segment.upper(), session_type
+        data = await get_executor().run(
+            service.get_driver_qualifying_telemetry,
+            year, round_number, driver_code, segment.upper(), session_type,
+            split_list(fields)
         )
 
         if data is None:
@@ -59,5 +78,9 @@ async def get_driver_qualifying_telemetry(
         return data
     except HTTPException:
         raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=504, detail="Timed out computing driver telemetry, try again shortly")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching driver telemetry: {str(e)}")
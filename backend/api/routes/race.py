@@ -1,37 +1,44 @@
 """Race telemetry API endpoints."""
-from fastapi import APIRouter, HTTPException, Query
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, HTTPException, Query, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import FileResponse, Response, StreamingResponse
 from typing import Optional
-from services.f1_data_service import get_f1_service
+from services.f1_data_service import (
+    get_f1_service,
+    FRAMES_MEDIA_TYPE,
+    DELTA_MEDIA_TYPE,
+    DEFAULT_KEYFRAME_INTERVAL,
+)
+from services.executor import get_executor
+from services.encoding import JSON_MEDIA_TYPE, encode_json
+from api.params import split_list
+from services.live_playback import PlaybackClock, TICK_SECONDS
 from models.schemas import RaceTelemetryResponse, TrackGeometryResponse
+import asyncio
 import json
-import numpy as np
 
 router = APIRouter(prefix="/race", tags=["race"])
 
-
-class NumpyEncoder(json.JSONEncoder):
-    """Custom JSON encoder for numpy types."""
-    def default(self, obj):
-        if isinstance(obj, np.integer):
-            return int(obj)
-        if isinstance(obj, np.floating):
-            return float(obj)
-        if isinstance(obj, np.ndarray):
-            return obj.tolist()
-        if isinstance(obj, np.bool_):
-            return bool(obj)
-        return super().default(obj)
+# What a send raises once the client has gone: Starlette's RuntimeError after
+# a close, or uvicorn's ClientDisconnected (an OSError) mid-send
+_SEND_FAILED = (WebSocketDisconnect, RuntimeError, OSError)
 
 
 @router.get("/{year}/{round_number}/{session_type}/telemetry")
 async def get_race_telemetry(
+    request: Request,
     year: int,
     round_number: int,
     session_type: str = "R",
     refresh: bool = Query(False, description="Force refresh data from source"),
     start_frame: int = Query(0, description="Starting frame index"),
-    frame_count: int = Query(1000, description="Number of frames to return")
+    frame_count: int = Query(1000, description="Number of frames to return"),
+    t_start: Optional[float] = Query(None, description="Start time in seconds (inclusive)"),
+    t_end: Optional[float] = Query(None, description="End time in seconds (inclusive)"),
+    lap_start: Optional[int] = Query(None, description="First leader lap (inclusive)"),
+    lap_end: Optional[int] = Query(None, description="Last leader lap (inclusive)"),
+    drivers: Optional[str] = Query(None, description="Comma-separated driver codes, e.g. VER,HAM"),
+    fields: Optional[str] = Query(None, description="Comma-separated driver fields, e.g. x,y,position"),
+    keyframe_interval: int = Query(DEFAULT_KEYFRAME_INTERVAL, ge=1, description="Frames between keyframes (delta encoding)")
 ):
     """
     Get race telemetry data with pagination support.
@@ -42,43 +49,67 @@ async def get_race_telemetry(
     - **refresh**: Force recompute telemetry data (default: False)
     - **start_frame**: Starting frame index (default: 0)
     - **frame_count**: Number of frames to return (default: 1000)
+    - **t_start** / **t_end**: Limit the frames to a time range in seconds
+    - **lap_start** / **lap_end**: Limit the frames to leader laps, instead of a time range
+    - **drivers**: Only include these drivers (default: all)
+    - **fields**: Only include these driver fields (default: all)
+
+    With a range, paging starts at the range start (or start_frame if that
+    is later) and has_more turns false at the end of the range.
+
+    Send `Accept: application/vnd.f1live.frames` to get the page in the
+    compact binary encoding (see core/f1_integration/frame_codec.py) instead
+    of JSON, or `Accept: application/vnd.f1live.delta-frames` for keyframes
+    every keyframe_interval frames with quantized deltas in between, for
+    low-bandwidth viewers. Whole pages (start_frame a multiple of RACE_PAGE_FRAMES,
+    frame_count equal to it) are served from pre-compressed files when the
+    client accepts gzip or brotli.
     """
     try:
         service = get_f1_service()
-        data = service.get_race_data(year, round_number, session_type)
-
-        # Extract frames slice for pagination
-        all_frames = data.get('frames', [])
-        total_frames = len(all_frames)
-
-        # Get requested slice
-        end_frame = min(start_frame + frame_count, total_frames)
-        frames_slice = all_frames[start_frame:end_frame]
-
-        print(f"DEBUG: Total frames: {total_frames}, returning frames {start_frame}-{end_frame}")
-
-        # Build response with sliced frames
-        response_data = {
-            "frames": frames_slice,
-            "track_statuses": data.get('track_statuses', []),
-            "driver_colors": data.get('driver_colors', {}),
-            "total_laps": data.get('total_laps', 0),
-            "total_frames": total_frames,
-            "start_frame": start_frame,
-            "end_frame": end_frame,
-            "has_more": end_frame < total_frames
-        }
-
-        # Use custom encoder for numpy types
-        try:
-            json_str = json.dumps(response_data, cls=NumpyEncoder)
-            print(f"DEBUG: JSON serialization successful, length: {len(json_str)} chars")
-            return JSONResponse(content=json.loads(json_str))
-        except Exception as json_error:
-            print(f"ERROR: JSON serialization failed: {json_error}")
-            import traceback
-            traceback.print_exc()
-            raise HTTPException(status_code=500, detail=f"JSON serialization error: {str(json_error)}")
+        accept = request.headers.get("accept", "")
+        if DELTA_MEDIA_TYPE in accept:
+            encoding, media_type = "delta", DELTA_MEDIA_TYPE
+        elif FRAMES_MEDIA_TYPE in accept:
+            encoding, media_type = "frames", FRAMES_MEDIA_TYPE
+        else:
+            encoding, media_type = "json", JSON_MEDIA_TYPE
+
+        ranged = any(bound is not None for bound in (t_start, t_end, lap_start, lap_end))
+        projected = drivers is not None or fields is not None
+
+        # Whole pages of JSON are served pre-compressed straight from disk
+        if encoding == "json" and not refresh and not ranged and not projected:
+            page_file = await get_executor().run(
+                service.get_race_page_file, year, round_number, session_type,
+                start_frame, frame_count, request.headers.get("accept-encoding")
+            )
+            if page_file is not None:
+                path, content_encoding = page_file
+                return FileResponse(path, media_type=JSON_MEDIA_TYPE, headers={
+                    "Content-Encoding": content_encoding,
+                    "Vary": "Accept, Accept-Encoding",
+                })
+
+        response_data = await get_executor().run(
+            service.get_race_page, year, round_number, session_type,
+            start_frame, frame_count, refresh=refresh, encoding=encoding,
+            t_start=t_start, t_end=t_end, lap_start=lap_start, lap_end=lap_end,
+            drivers=split_list(drivers), fields=split_list(fields),
+            keyframe_interval=keyframe_interval
+        )
+        if encoding != "json":
+            return Response(content=response_data, media_type=media_type, headers={"Vary": "Accept, Accept-Encoding"})
+
+        # Encoded once, straight from the NumPy-backed page to bytes
+        body = await get_executor().run(encode_json, response_data)
+        return Response(content=body, media_type=JSON_MEDIA_TYPE, headers={"Vary": "Accept, Accept-Encoding"})
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=504, detail="Timed out computing race telemetry, try again shortly")
     except Exception as e:
         print(f"ERROR in get_race_telemetry: {str(e)}")
         import traceback
@@ -86,6 +117,225 @@ async def get_race_telemetry(
         raise HTTPException(status_code=500, detail=f"Error fetching race telemetry: {str(e)}")
 
 
+@router.get("/{year}/{round_number}/{session_type}/telemetry/overview")
+async def get_race_overview(
+    year: int,
+    round_number: int,
+    session_type: str = "R",
+    resolution: float = Query(1, description="Pyramid level in Hz: 25, 5, 1 or 0.1"),
+    t_start: Optional[float] = Query(None, description="Start time in seconds (inclusive)"),
+    t_end: Optional[float] = Query(None, description="End time in seconds (inclusive)"),
+    drivers: Optional[str] = Query(None, description="Comma-separated driver codes, e.g. VER,HAM"),
+    fields: Optional[str] = Query(None, description="Comma-separated driver fields, e.g. position,speed")
+):
+    """
+    Get a decimated overview of the race for charts and scrubbing.
+
+    Served from a pyramid precomputed with the race telemetry. Each bucket
+    covers 1/resolution seconds; continuous fields (x, y, speed, ...) give
+    min/max/mean per bucket, integer fields (position, lap, gear, ...) the
+    value at the end of the bucket. Data is columnar: one list per driver,
+    in driver_codes order.
+
+    - **year**: Season year (e.g., 2024)
+    - **round_number**: Round number (1-24)
+    - **session_type**: Session type ('R' for Race, 'S' for Sprint)
+    - **resolution**: Buckets per second (default: 1)
+    - **t_start** / **t_end**: Limit the buckets to a time range in seconds
+    - **drivers** / **fields**: Only include these drivers / driver fields
+    """
+    try:
+        service = get_f1_service()
+        data = await get_executor().run(
+            service.get_race_overview, year, round_number, session_type,
+            resolution, t_start, t_end, split_list(drivers), split_list(fields)
+        )
+        body = await get_executor().run(encode_json, data)
+        return Response(content=body, media_type=JSON_MEDIA_TYPE)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=504, detail="Timed out computing race telemetry, try again shortly")
+    except Exception as e:
+        print(f"ERROR in get_race_overview: {str(e)}")
+        import traceback
+        traceback.print_exc()
+        raise HTTPException(status_code=500, detail=f"Error fetching race overview: {str(e)}")
+
+
+@router.get("/{year}/{round_number}/{session_type}/telemetry/stream")
+async def stream_race_telemetry(
+    year: int,
+    round_number: int,
+    session_type: str = "R",
+    start_frame: Optional[int] = Query(None, description="First frame index (inclusive)"),
+    end_frame: Optional[int] = Query(None, description="Last frame index (exclusive)"),
+    t_start: Optional[float] = Query(None, description="Start time in seconds (inclusive)"),
+    t_end: Optional[float] = Query(None, description="End time in seconds (inclusive)"),
+    lap_start: Optional[int] = Query(None, description="First leader lap (inclusive)"),
+    lap_end: Optional[int] = Query(None, description="Last leader lap (inclusive)"),
+    drivers: Optional[str] = Query(None, description="Comma-separated driver codes, e.g. VER,HAM"),
+    fields: Optional[str] = Query(None, description="Comma-separated driver fields, e.g. x,y,position")
+):
+    """
+    Stream race telemetry frames as newline-delimited JSON.
+
+    Each line is one frame in the same format as the paginated endpoint.
+    Frames are encoded in small chunks as they are sent, so clients can start
+    rendering after the first lines and server memory doesn't grow with the
+    range. The resolved range is returned in the X-Start-Frame, X-End-Frame
+    and X-Total-Frames headers.
+
+    - **year**: Season year (e.g., 2024)
+    - **round_number**: Round number (1-24)
+    - **session_type**: Session type ('R' for Race, 'S' for Sprint)
+    - **start_frame** / **end_frame**: Frame bounds (default: whole race)
+    - **t_start** / **t_end**: Time bounds in seconds, instead of frame bounds
+    - **lap_start** / **lap_end**: Leader lap bounds, instead of frame or time bounds
+    - **drivers** / **fields**: Only include these drivers / driver fields
+    """
+    try:
+        service = get_f1_service()
+        stream = await get_executor().run(
+            service.get_race_stream, year, round_number, session_type,
+            start_frame, end_frame, t_start, t_end, lap_start, lap_end,
+            split_list(drivers), split_list(fields)
+        )
+        return StreamingResponse(
+            stream["lines"],
+            media_type="application/x-ndjson",
+            headers={
+                "X-Start-Frame": str(stream["start_frame"]),
+                "X-End-Frame": str(stream["end_frame"]),
+                "X-Total-Frames": str(stream["total_frames"]),
+            },
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=504, detail="Timed out computing race telemetry, try again shortly")
+    except Exception as e:
+        print(f"ERROR in stream_race_telemetry: {str(e)}")
+        import traceback
+        traceback.print_exc()
+        raise HTTPException(status_code=500, detail=f"Error streaming race telemetry: {str(e)}")
+
+
+@router.websocket("/{year}/{round_number}/{session_type}/live")
+async def race_live(
+    websocket: WebSocket,
+    year: int,
+    round_number: int,
+    session_type: str = "R"
+):
+    """
+    Push race frames over a WebSocket at the playback rate.
+
+    The server sends a `meta` message (total_frames, driver_colors,
+    track_statuses, total_laps), then `state` messages after every command and
+    `frames` messages ({"start_frame", "frames"}) as playback advances.
+    Playback starts paused. Clients send JSON commands:
+
+    - `{"action": "play"}` / `{"action": "pause"}`
+    - `{"action": "seek", "frame": 1200}` or `{"action": "seek", "t": 600.0}`
+    - `{"action": "speed", "value": 4}` (0.5 to 16)
+    """
+    await websocket.accept()
+    try:
+        service = get_f1_service()
+        data = await get_executor().run(service.get_race_data, year, round_number, session_type)
+    except Exception as e:
+        print(f"ERROR in race_live: {str(e)}")
+        try:
+            await websocket.send_json({"type": "error", "detail": f"Error loading race telemetry: {str(e)}"})
+            await websocket.close(code=1011)
+        except _SEND_FAILED:
+            pass
+        return
+
+    telemetry = data['telemetry']
+    clock = PlaybackClock(telemetry.timeline)
+    commands = asyncio.Queue()
+    receiver = asyncio.create_task(_receive_commands(websocket, commands))
+
+    try:
+        await websocket.send_json({
+            "type": "meta",
+            "total_frames": len(telemetry),
+            "driver_colors": data['driver_colors'],
+            "track_statuses": data['track_statuses'],
+            "total_laps": data['total_laps'],
+        })
+        await websocket.send_json(clock.state())
+
+        while True:
+            try:
+                command = await asyncio.wait_for(commands.get(), TICK_SECONDS)
+            except asyncio.TimeoutError:
+                command = False
+
+            if command is None:  # Client went away
+                break
+            if command:
+                await websocket.send_json(_apply_command(clock, command))
+
+            start, stop = clock.due_frames()
+            if stop > start:
+                # Frames are read from memory-mapped columns; page faults block,
+                # so build the message off the event loop
+                message = await get_executor().run(_frames_message, telemetry, start, stop)
+                await websocket.send_text(message)
+                if clock.finished:
+                    await websocket.send_json(clock.state())
+    except _SEND_FAILED:
+        pass  # Client went away mid-send
+    finally:
+        receiver.cancel()
+
+
+def _frames_message(telemetry, start: int, stop: int) -> str:
+    return encode_json({
+        "type": "frames",
+        "start_frame": start,
+        "frames": telemetry.frames(start, stop),
+    }).decode()
+
+
+async def _receive_commands(websocket: WebSocket, commands: asyncio.Queue):
+    """Queue parsed client commands; None marks the end of the connection."""
+    try:
+        while True:
+            text = await websocket.receive_text()
+            try:
+                command = json.loads(text)
+            except ValueError:
+                command = {"action": "invalid"}
+            await commands.put(command if isinstance(command, dict) else {"action": "invalid"})
+    except WebSocketDisconnect:
+        pass
+    finally:
+        await commands.put(None)
+
+
+def _apply_command(clock: PlaybackClock, command: dict):
+    """Apply one client command; returns the new state or an error message."""
+    action = command.get("action")
+    try:
+        if action == "play":
+            clock.play()
+        elif action == "pause":
+            clock.pause()
+        elif action == "seek":
+            clock.seek(frame=command.get("frame"), t=command.get("t"))
+        elif action == "speed":
+            clock.set_speed(command.get("value"))
+        else:
+            return {"type": "error", "detail": f"Unknown action: {action}"}
+    except (TypeError, ValueError) as e:
+        return {"type": "error", "detail": str(e)}
+    return clock.state()
+
+
 @router.get("/{year}/{round_number}/{session_type}/track")
 async def get_track_geometry(
     year: int,
@@ -101,7 +351,9 @@ async def get_track_geometry(
     """
     try:
         service = get_f1_service()
-        data = service.get_track_geometry(year, round_number, session_type)
+        data = await get_executor().run(service.get_track_geometry, year, round_number, session_type)
         return data
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=504, detail="Timed out loading track geometry, try again shortly")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching track geometry: {str(e)}")
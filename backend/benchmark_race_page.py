@@ -0,0 +1,110 @@
+"""
+Benchmark encoding one race telemetry page: the old triple round trip
+(json.dumps with NumpyEncoder, json.loads, JSONResponse) against the single
+orjson encode used by the race telemetry route.
+
+Runs on a synthetic race, so it needs no network or FastF1 cache:
+
+    python benchmark_race_page.py [num_drivers] [frame_count]
+"""
+import json
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+from fastapi.responses import JSONResponse
+
+# Add the f1_integration directory to Python path
+sys.path.insert(0, str(Path(__file__).parent / "core" / "f1_integration"))
+
+from frame_store import DRIVER_FIELDS, RaceFrameStore
+from services.encoding import encode_json
+
+REPEATS = 10
+
+
+class NumpyEncoder(json.JSONEncoder):
+    """The encoder the race route used before the single-encode path."""
+    def default(self, obj):
+        if isinstance(obj, np.integer):
+            return int(obj)
+        if isinstance(obj, np.floating):
+            return float(obj)
+        if isinstance(obj, np.ndarray):
+            return obj.tolist()
+        if isinstance(obj, np.bool_):
+            return bool(obj)
+        return super().default(obj)
+
+
+def synthetic_page(num_drivers, frame_count):
+    rng = np.random.default_rng(0)
+    columns = {}
+    for field, (_, decimals) in DRIVER_FIELDS.items():
+        if decimals is None:
+            columns[field] = rng.integers(0, 20, (num_drivers, frame_count))
+        else:
+            columns[field] = rng.uniform(0, 5000, (num_drivers, frame_count))
+    columns["position"] = np.argsort(rng.random((num_drivers, frame_count)), axis=0) + 1
+
+    store = RaceFrameStore.from_arrays(
+        timeline=np.arange(frame_count) / 25,
+        driver_codes=[f"D{j:02d}" for j in range(num_drivers)],
+        columns=columns,
+        leader_lap=rng.integers(1, 60, frame_count),
+        weather={name: rng.uniform(0, 50, frame_count) for name in ("track_temp", "air_temp", "rainfall")},
+    )
+    return {
+        "frames": store.frames(0, frame_count),
+        "track_statuses": [],
+        "driver_colors": {code: [255, 0, 0] for code in store.driver_codes},
+        "total_laps": 57,
+        "total_frames": frame_count,
+        "start_frame": 0,
+        "end_frame": frame_count,
+        "has_more": False,
+    }
+
+
+def triple_encode(data):
+    json_str = json.dumps(data, cls=NumpyEncoder)
+    return JSONResponse(content=json.loads(json_str)).body
+
+
+def single_encode(data):
+    return encode_json(data)
+
+
+def measure(encode, data):
+    """Best wall time over REPEATS runs, and peak traced allocation of one run."""
+    times = []
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        body = encode(data)
+        times.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    encode(data)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return min(times), peak, len(body)
+
+
+def main():
+    num_drivers = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    frame_count = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+    data = synthetic_page(num_drivers, frame_count)
+
+    # Both paths must produce the same document
+    assert json.loads(triple_encode(data)) == json.loads(single_encode(data))
+
+    print(f"Page of {frame_count} frames x {num_drivers} drivers")
+    for name, encode in [("dumps/loads/JSONResponse", triple_encode), ("orjson single encode", single_encode)]:
+        seconds, peak, size = measure(encode, data)
+        print(f"  {name:26s} {seconds * 1000:8.1f} ms  peak alloc {peak / 1e6:7.1f} MB  body {size / 1e6:5.2f} MB")
+
+
+if __name__ == "__main__":
+    main()
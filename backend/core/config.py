@@ -13,6 +13,36 @@ COMPUTED_DATA_DIR = BASE_DIR / "computed_data"
 FASTF1_CACHE_DIR.mkdir(exist_ok=True)
 COMPUTED_DATA_DIR.mkdir(exist_ok=True)
 
+# In-memory cache of loaded FastF1 sessions
+SESSION_CACHE_MAX_ENTRIES = int(os.getenv("SESSION_CACHE_MAX_ENTRIES", "4"))
+SESSION_CACHE_MAX_BYTES = int(os.getenv("SESSION_CACHE_MAX_MB", "4096")) * 1024 * 1024
+
+# In-memory tier of computed telemetry results (backed by COMPUTED_DATA_DIR)
+RESULT_CACHE_MAX_BYTES = int(os.getenv("RESULT_CACHE_MAX_MB", "1024")) * 1024 * 1024
+
+# Blocking work (FastF1 loads, telemetry computation) runs in a bounded thread pool
+BLOCKING_MAX_WORKERS = int(os.getenv("BLOCKING_MAX_WORKERS", "16"))
+# At most this many sessions are computed from scratch at the same time
+COMPUTE_MAX_CONCURRENCY = int(os.getenv("COMPUTE_MAX_CONCURRENCY", "2"))
+# Cold computations and session loads run on their own pool of this many threads,
+# so requests for cached data never wait behind them
+COLD_WORK_MAX_WORKERS = int(os.getenv("COLD_WORK_MAX_WORKERS", "4"))
+# Seconds a request waits for its data before returning 504
+REQUEST_TIMEOUT_SECONDS = float(os.getenv("REQUEST_TIMEOUT_SECONDS", "900"))
+
+# Long-lived process pool for per-driver telemetry extraction (0 = one per CPU)
+WORKER_POOL_PROCESSES = int(os.getenv("WORKER_POOL_PROCESSES", "0")) or os.cpu_count()
+# Tasks (drivers) a pool worker processes before it is replaced
+WORKER_POOL_MAX_TASKS = int(os.getenv("WORKER_POOL_MAX_TASKS", "100"))
+# Seconds one session's per-driver tasks may take before it fails and the pool is replaced
+WORKER_POOL_TIMEOUT_SECONDS = float(os.getenv("WORKER_POOL_TIMEOUT_SECONDS", "600"))
+
+# Background precompute jobs run at the same time
+JOBS_MAX_WORKERS = int(os.getenv("JOBS_MAX_WORKERS", "2"))
+
+# Frames per pre-compressed race telemetry page (matches the client's page size)
+RACE_PAGE_FRAMES = int(os.getenv("RACE_PAGE_FRAMES", "1000"))
+
 # API Configuration
 API_V1_PREFIX = "/api"
 PROJECT_NAME = "F1 Race Replay API"
@@ -2,14 +2,18 @@ import os
 import sys
 import fastf1
 import fastf1.plotting
+from fastf1.core import Laps, Telemetry
 from multiprocessing import Pool, cpu_count
 import numpy as np
 import json
 import pickle
+import weakref
 from datetime import timedelta
 
 from lib.tyres import get_tyre_compound_int
 from lib.time import parse_time_string, format_time
+from frame_store import RaceFrameStore, TelemetryPyramid, load_race_telemetry, save_race_telemetry
+from track_index import TrackIndex
 
 import pandas as pd
 
@@ -51,125 +55,235 @@ def _interpolate_track_points(xs, ys, interp_points=4000):
 
     return xs_interp, ys_interp, cumulative_dists
 
-def _project_to_reference(x, y, ref_xs, ref_ys, cumulative_dists):
+def _smooth_race_progress(laps, projected_dists, track_length):
     """
-    Project a point (x, y) onto the dense reference polyline and return
-    the cumulative distance along the track.
+    Race progress of one driver across the race, with GPS noise smoothed out.
+
+    race_progress = (lap - 1) * track_length + projected_distance, then for
+    every frame that moves backwards relative to the previous frame:
+      - lap completions (lap incremented near the start of the track) and
+        wraps of the projected distance from the end of the track to the
+        start keep the calculated value
+      - backward jumps under 10m are GPS noise, replaced by the previous
+        value plus 1m
+      - larger backward jumps are real (being overtaken, off track, etc.)
+        and are kept
+
+    Frames are only walked one at a time from a smoothed frame until the
+    calculated value catches up again; everything else is array operations.
     """
-    # Find nearest point on the polyline using vectorized distance calculation
-    dists_sq = (ref_xs - x)**2 + (ref_ys - y)**2
-    nearest_idx = np.argmin(dists_sq)
-
-    # For better accuracy, project onto the segment between nearest and next point
-    if nearest_idx < len(ref_xs) - 1:
-        # Get the segment
-        p0 = np.array([ref_xs[nearest_idx], ref_ys[nearest_idx]])
-        p1 = np.array([ref_xs[nearest_idx + 1], ref_ys[nearest_idx + 1]])
-        p = np.array([x, y])
-
-        # Project p onto the line segment from p0 to p1
-        v = p1 - p0
-        u = p - p0
-        v_len_sq = np.dot(v, v)
-
-        if v_len_sq > 0:
-            t = np.clip(np.dot(u, v) / v_len_sq, 0, 1)
-            # Distance along the segment
-            segment_offset = t * np.linalg.norm(v)
-            return cumulative_dists[nearest_idx] + segment_offset
-
-    # Fallback to nearest point
-    return cumulative_dists[nearest_idx]
+    laps = np.asarray(laps)
+    projected_dists = np.asarray(projected_dists, dtype=float)
+    num_frames = len(projected_dists)
+
+    calculated = (np.maximum(laps, 1) - 1) * track_length + projected_dists
+    race_progress = calculated.copy()
+    if num_frames == 0:
+        return race_progress
+
+    # Lap and projected distance of the previous frame are never smoothed
+    prev_lap = np.concatenate([[1], laps[:-1]])
+    prev_projected_dist = np.concatenate([[0.0], projected_dists[:-1]])
+
+    near_start = projected_dists < 0.3 * track_length
+    is_lap_completion = (laps > prev_lap) & near_start
+    is_distance_wrap = (prev_projected_dist > 0.7 * track_length) & near_start
+    allow_backward = is_lap_completion | is_distance_wrap
+
+    # Frames that get smoothed when the previous frame kept its calculated value
+    prev_calculated = np.concatenate([[0.0], calculated[:-1]])
+    backward_jump = prev_calculated - calculated
+    starts_smoothing = (backward_jump > 0) & (backward_jump < 10.0) & ~allow_backward
+    smoothing_starts = np.flatnonzero(starts_smoothing)
+
+    i = 0
+    while True:
+        # Next frame that is smoothed, given that frame i - 1 kept its calculated value
+        k = np.searchsorted(smoothing_starts, i)
+        if k == len(smoothing_starts):
+            break
+        i = smoothing_starts[k]
+
+        prev = race_progress[i - 1] if i > 0 else 0.0
+        while i < num_frames:
+            if calculated[i] < prev and not allow_backward[i] and prev - calculated[i] < 10.0:
+                prev += 1.0
+                race_progress[i] = prev
+                i += 1
+            else:
+                break
+
+        # Frame i kept its calculated value, so vectorized detection applies from i + 1
+        i += 1
+
+    return race_progress
+
+class _SessionClock:
+    """
+    Stand-in for the Session on telemetry handed to worker processes.
+
+    Slicing and merging Telemetry only reads session.t0_date, while pickling a
+    Telemetry or Laps object pickles the whole session it points to.
+    """
+
+    def __init__(self, t0_date):
+        self.t0_date = t0_date
+
+
+def _driver_slice(session, driver_no):
+    """
+    Everything a worker needs to process one driver, without the session.
+
+    Returns (laps, car_data, pos_data): the driver's laps as a plain DataFrame
+    and their car and position telemetry pointing at a _SessionClock. Returns
+    None for a driver with no laps or no telemetry (e.g. a DNS).
+    """
+    laps = pd.DataFrame(session.laps.pick_drivers(driver_no))
+    car_data = session.car_data.get(driver_no)
+    pos_data = session.pos_data.get(driver_no)
+    if laps.empty or car_data is None or pos_data is None:
+        return None
+
+    clock = _SessionClock(session.t0_date)
+    car_data = Telemetry(car_data, session=clock, driver=driver_no)
+    pos_data = Telemetry(pos_data, session=clock, driver=driver_no)
+    return laps, car_data, pos_data
+
+
+def _worker_laps(laps, car_data):
+    """Rebuild a worker's Laps from the plain DataFrame sent by _driver_slice."""
+    return Laps(laps, session=car_data.session)
+
+
+def _lap_telemetry(lap, car_data, pos_data):
+    """
+    Same as lap.get_telemetry(), from the driver's own car and position data.
+
+    Leaves out the DriverAhead channels, which need every other driver's data
+    and aren't used here.
+    """
+    pos_lap = pos_data.slice_by_lap(lap, pad=1, pad_side='both').reset_index(drop=True)
+    car_lap = car_data.slice_by_lap(lap, pad=1, pad_side='both').reset_index(drop=True)
+    car_lap = car_lap.add_distance().add_relative_distance()
+    return pos_lap.merge_channels(car_lap).slice_by_lap(lap, interpolate_edges=True)
+
+
+def _race_lap_samples(laps, car_data, pos_data):
+    """
+    A driver's whole-race telemetry, split lap by lap.
+
+    Merges the race's car and position data once and finds each lap's samples
+    with searchsorted, instead of merging every lap again with
+    lap.get_telemetry(). Per-lap Distance and RelativeDistance are integrated
+    from Speed the same way Telemetry.add_distance() does for a single lap.
+
+    Returns (merged, lap_idx, sample_idx, dist, rel_dist): the merged
+    telemetry, and for every output sample the position of its lap in laps,
+    its row in merged and its distance into the lap. Samples on a boundary
+    between two laps appear in both, as they do with per-lap telemetry.
+    Returns None if there is no telemetry within the laps.
+    """
+    lap_starts = laps["LapStartTime"].dt.total_seconds().to_numpy()
+    lap_ends = laps["Time"].dt.total_seconds().to_numpy()
+    race_start = laps["LapStartTime"].min()
+    race_end = laps["Time"].max()
+
+    car = car_data.slice_by_time(race_start, race_end, pad=1, pad_side='both').reset_index(drop=True)
+    pos = pos_data.slice_by_time(race_start, race_end, pad=1, pad_side='both').reset_index(drop=True)
+    if car.empty or pos.empty:
+        return None
+
+    # Merge once, with exact samples at every lap start and end
+    # (what slice_by_lap(interpolate_edges=True) adds to each lap)
+    merged = pos.merge_channels(car)
+    edge_times = pd.to_timedelta(np.unique(np.concatenate([lap_starts, lap_ends])), unit="s")
+    edges = Telemetry(
+        {"SessionTime": edge_times, "Date": edge_times + car.session.t0_date},
+        session=car.session,
+    )
+    merged = merged.merge_channels(edges, frequency='original')
+    t = merged["SessionTime"].dt.total_seconds().to_numpy()
+
+    # Each lap's rows of merged, as one flat index
+    lo = np.searchsorted(t, lap_starts, side='left')
+    hi = np.searchsorted(t, lap_ends, side='right')
+    counts = np.maximum(hi - lo, 0)
+    lap_idx = np.repeat(np.arange(len(laps)), counts)
+    first_out = np.cumsum(counts) - counts
+    sample_idx = lo[lap_idx] + np.arange(counts.sum()) - first_out[lap_idx]
+
+    # Distance driven since the start of the race at every car sample. A lap's
+    # Distance starts from its padding sample before the lap start, whose
+    # integration step runs back to the lap start itself
+    car_t = car["SessionTime"].dt.total_seconds().to_numpy()
+    car_speed = car["Speed"].to_numpy(dtype=float) / 3.6
+    race_dist = np.concatenate([[0.0], np.cumsum(car_speed[1:] * np.diff(car_t))])
+    before = np.maximum(np.searchsorted(car_t, lap_starts, side='left') - 1, 0)
+    lap_offset = race_dist[before] - car_speed[before] * (car_t[before] - lap_starts)
+
+    # RelativeDistance is relative to the padding sample after the lap end
+    after = np.minimum(np.searchsorted(car_t, lap_ends, side='right'), len(car_t) - 1)
+    lap_length = race_dist[after] - lap_offset
+
+    dist = np.interp(t[sample_idx], car_t, race_dist) - lap_offset[lap_idx]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rel_dist = dist / lap_length[lap_idx]
+
+    return merged, lap_idx, sample_idx, dist, rel_dist
 
 def _process_single_driver(args):
     """Process telemetry data for a single driver - must be top-level for multiprocessing"""
-    driver_no, session, driver_code = args
+    driver_code, laps, car_data, pos_data = args
     
     print(f"Getting telemetry for driver: {driver_code}")
 
-    laps_driver = session.laps.pick_drivers(driver_no)
-    if laps_driver.empty:
+    if laps.empty:
         return None
 
-    driver_max_lap = laps_driver.LapNumber.max() if not laps_driver.empty else 0
-
-    t_all = []
-    x_all = []
-    y_all = []
-    race_dist_all = []
-    rel_dist_all = []
-    lap_numbers = []
-    tyre_compounds = []
-    speed_all = []
-    gear_all = []
-    drs_all = []
-    throttle_all = []
-    brake_all = []
-
-    total_dist_so_far = 0.0
-
-    # iterate laps in order
-    for _, lap in laps_driver.iterlaps():
-        # get telemetry for THIS lap only
-        lap_tel = lap.get_telemetry()
-        lap_number = lap.LapNumber
-        tyre_compund_as_int = get_tyre_compound_int(lap.Compound)
-
-        if lap_tel.empty:
-            continue
+    driver_max_lap = laps.LapNumber.max()
 
-        t_lap = lap_tel["SessionTime"].dt.total_seconds().to_numpy()
-        x_lap = lap_tel["X"].to_numpy()
-        y_lap = lap_tel["Y"].to_numpy()
-        d_lap = lap_tel["Distance"].to_numpy()          
-        rd_lap = lap_tel["RelativeDistance"].to_numpy()
-        speed_kph_lap = lap_tel["Speed"].to_numpy()
-        gear_lap = lap_tel["nGear"].to_numpy()
-        drs_lap = lap_tel["DRS"].to_numpy()
-        throttle_lap = lap_tel["Throttle"].to_numpy()
-        brake_lap = lap_tel["Brake"].to_numpy().astype(float)
-
-        # race distance = distance before this lap + distance within this lap
-        race_d_lap = total_dist_so_far + d_lap
-
-        t_all.append(t_lap)
-        x_all.append(x_lap)
-        y_all.append(y_lap)
-        race_dist_all.append(race_d_lap)
-        rel_dist_all.append(rd_lap)
-        lap_numbers.append(np.full_like(t_lap, lap_number))
-        tyre_compounds.append(np.full_like(t_lap, tyre_compund_as_int))
-        speed_all.append(speed_kph_lap)
-        gear_all.append(gear_lap)
-        drs_all.append(drs_lap)
-        throttle_all.append(throttle_lap)
-        brake_all.append(brake_lap)
-
-        # Update cumulative distance for next lap
-        # Use the max distance from this lap as the starting point for the next lap
-        if len(d_lap) > 0:
-            total_dist_so_far += d_lap.max()
-
-    if not t_all:
+    # Laps without timing can't be matched to telemetry
+    laps = laps.dropna(subset=["LapStartTime", "Time"])
+    if laps.empty:
         return None
 
-    # Concatenate all arrays at once for better performance
-    all_arrays = [t_all, x_all, y_all, race_dist_all, rel_dist_all, 
-                  lap_numbers, tyre_compounds, speed_all, gear_all, drs_all]
-    
-    t_all, x_all, y_all, race_dist_all, rel_dist_all, lap_numbers, \
-    tyre_compounds, speed_all, gear_all, drs_all = [np.concatenate(arr) for arr in all_arrays]
+    samples = _race_lap_samples(laps, car_data, pos_data)
+    if samples is None:
+        return None
+    merged, lap_idx, sample_idx, d_all, rel_dist_all = samples
+    if len(sample_idx) == 0:
+        return None
+
+    lap_numbers = laps["LapNumber"].to_numpy(dtype=float)[lap_idx]
+    tyre_compounds = np.array(
+        [get_tyre_compound_int(compound) for compound in laps["Compound"]], dtype=float
+    )[lap_idx]
+
+    # race distance = distance before this lap + distance within this lap,
+    # using each lap's max distance as the starting point for the next lap
+    lap_max_dist = np.full(len(laps), -np.inf)
+    np.maximum.at(lap_max_dist, lap_idx, d_all)
+    has_samples = np.bincount(lap_idx, minlength=len(laps)) > 0
+    lap_max_dist[~has_samples] = 0.0
+    dist_before_lap = np.cumsum(lap_max_dist) - lap_max_dist
+    race_dist_all = dist_before_lap[lap_idx] + d_all
+
+    t_all = merged["SessionTime"].dt.total_seconds().to_numpy()[sample_idx]
+    x_all = merged["X"].to_numpy()[sample_idx]
+    y_all = merged["Y"].to_numpy()[sample_idx]
+    speed_all = merged["Speed"].to_numpy()[sample_idx]
+    gear_all = merged["nGear"].to_numpy()[sample_idx]
+    drs_all = merged["DRS"].to_numpy()[sample_idx]
+    throttle_all = merged["Throttle"].to_numpy()[sample_idx]
+    brake_all = merged["Brake"].to_numpy().astype(float)[sample_idx]
 
     # Sort all arrays by time in one operation
-    order = np.argsort(t_all)
-    all_data = [t_all, x_all, y_all, race_dist_all, rel_dist_all, 
-                lap_numbers, tyre_compounds, speed_all, gear_all, drs_all]
-    
-    t_all, x_all, y_all, race_dist_all, rel_dist_all, lap_numbers, \
-    tyre_compounds, speed_all, gear_all, drs_all = [arr[order] for arr in all_data]
+    order = np.argsort(t_all, kind='stable')
+    all_data = [t_all, x_all, y_all, race_dist_all, rel_dist_all, lap_numbers,
+                tyre_compounds, speed_all, gear_all, drs_all, throttle_all, brake_all]
 
-    throttle_all = np.concatenate(throttle_all)[order]
-    brake_all = np.concatenate(brake_all)[order]
+    t_all, x_all, y_all, race_dist_all, rel_dist_all, lap_numbers, \
+    tyre_compounds, speed_all, gear_all, drs_all, throttle_all, brake_all = [arr[order] for arr in all_data]
 
     print(f"Completed telemetry for driver: {driver_code}")
     
@@ -194,6 +308,10 @@ def _process_single_driver(args):
         "max_lap": driver_max_lap
     }
 
+def get_event_session(year, round_number, session_type='R'):
+    # Session without any data loaded, enough to name its computed data files
+    return fastf1.get_session(year, round_number, session_type)
+
 def load_session(year, round_number, session_type='R'):
     # session_type: 'R' (Race), 'S' (Sprint) etc.
     session = fastf1.get_session(year, round_number, session_type)
@@ -217,32 +335,15 @@ def get_circuit_rotation(session):
     circuit = session.get_circuit_info()
     return circuit.rotation
 
-def get_race_telemetry(session, session_type='R'):
-
-    event_name = str(session).replace(' ', '_')
-    cache_suffix = 'sprint' if session_type == 'S' else 'race'
-
-    # Check if this data has already been computed
-
-    try:
-        if "--refresh-data" not in sys.argv:
-            with open(f"computed_data/{event_name}_{cache_suffix}_telemetry.pkl", "rb") as f:
-                frames = pickle.load(f)
-                print(f"Loaded precomputed {cache_suffix} telemetry data.")
-                print("The replay should begin in a new window shortly!")
-                return frames
-    except FileNotFoundError:
-        pass  # Need to compute from scratch
-
-    drivers = session.drivers
-
-    driver_codes = {
-        num: session.get_driver(num)["Abbreviation"]
-        for num in drivers
-    }
+def build_track_index(session):
+    """
+    Build the circuit's dense reference polyline and index it for projections.
 
+    The polyline comes from the first driver's first lap, falling back to the
+    circuit corners when there is no lap data.
+    """
     # Build dense reference polyline from an example lap for accurate position tracking
-    first_driver = drivers[0]
+    first_driver = session.drivers[0]
     example_laps = session.laps.pick_drivers(first_driver)
     if not example_laps.empty:
         example_lap_tel = example_laps.iloc[0].get_telemetry()
@@ -275,6 +376,102 @@ def get_race_telemetry(session, session_type='R'):
         track_length = cumulative_dists[-1]
         print(f"Built track reference from circuit corners (length: {track_length:.1f}m)")
 
+    return TrackIndex(ref_xs, ref_ys, cumulative_dists)
+
+def race_telemetry_path(session, session_type='R'):
+    """Path of the computed race telemetry directory (the session doesn't need to be loaded)."""
+    event_name = str(session).replace(' ', '_')
+    cache_suffix = 'sprint' if session_type == 'S' else 'race'
+    return f"computed_data/{event_name}_{cache_suffix}_telemetry"
+
+def quali_telemetry_path(session, session_type='Q'):
+    """Path of the computed qualifying telemetry pickle (the session doesn't need to be loaded)."""
+    event_name = str(session).replace(' ', '_')
+    cache_suffix = 'sprintquali' if session_type == 'SQ' else 'quali'
+    return f"computed_data/{event_name}_{cache_suffix}_telemetry.pkl"
+
+def quali_laps_path(session, session_type='Q'):
+    """Directory of per-driver, per-segment qualifying lap telemetry (the session doesn't need to be loaded)."""
+    event_name = str(session).replace(' ', '_')
+    cache_suffix = 'sprintquali' if session_type == 'SQ' else 'quali'
+    return f"computed_data/{event_name}_{cache_suffix}_laps"
+
+def quali_lap_path(session, session_type, driver_code, quali_segment):
+    """Path of one driver's computed lap telemetry for one qualifying segment."""
+    return os.path.join(quali_laps_path(session, session_type), f"{driver_code}_{quali_segment}.pkl")
+
+def load_precomputed_race_telemetry(session, session_type='R'):
+    """Return previously computed race telemetry, or None if it hasn't been computed yet."""
+    return load_race_telemetry(race_telemetry_path(session, session_type))
+
+def load_precomputed_quali_telemetry(session, session_type='Q'):
+    """Return previously computed qualifying telemetry, or None if it hasn't been computed yet."""
+    try:
+        with open(quali_telemetry_path(session, session_type), "rb") as f:
+            return pickle.load(f)
+    except FileNotFoundError:
+        return None
+
+def load_precomputed_quali_lap(session, session_type, driver_code, quali_segment):
+    """Return one driver's computed lap telemetry for a segment, or None if it hasn't been computed yet."""
+    return _load_quali_lap(quali_lap_path(session, session_type, driver_code, quali_segment))
+
+def _load_quali_lap(path):
+    try:
+        with open(path, "rb") as f:
+            return pickle.load(f)
+    except FileNotFoundError:
+        return None
+
+def _save_pickle(path, data):
+    # Written atomically: other workers and API processes read these while sessions compute
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp-{os.getpid()}"
+    with open(tmp_path, "wb") as f:
+        pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, path)
+
+def _map_drivers(pool, fn, driver_args):
+    """Run fn over the per-driver arguments on pool, or on a one-off Pool when pool is None."""
+    if pool is not None:
+        return pool.map(fn, driver_args)
+
+    num_processes = min(cpu_count(), len(driver_args))
+    with Pool(processes=num_processes) as one_off_pool:
+        return one_off_pool.map(fn, driver_args)
+
+def get_race_telemetry(session, session_type='R', pool=None):
+    """
+    Compute (or load) race telemetry for a loaded session.
+
+    pool is anything with a Pool-style map(fn, iterable), such as the
+    service's long-lived worker pool; by default a Pool is started for
+    this call.
+    """
+
+    cache_suffix = 'sprint' if session_type == 'S' else 'race'
+
+    # Check if this data has already been computed
+    telemetry_dir = race_telemetry_path(session, session_type)
+
+    if "--refresh-data" not in sys.argv:
+        cached = load_race_telemetry(telemetry_dir)
+        if cached is not None:
+            print(f"Loaded precomputed {cache_suffix} telemetry data.")
+            print("The replay should begin in a new window shortly!")
+            return cached
+
+    drivers = session.drivers
+
+    driver_codes = {
+        num: session.get_driver(num)["Abbreviation"]
+        for num in drivers
+    }
+
+    # Dense reference polyline (with a spatial index) for accurate position tracking
+    track_index = build_track_index(session)
+    track_length = track_index.length
+
     driver_data = {}
 
     global_t_min = None
@@ -283,14 +480,18 @@ def get_race_telemetry(session, session_type='R'):
     max_lap_number = 0
 
     # 1. Get all of the drivers telemetry data using multiprocessing
-    # Prepare arguments for parallel processing
+    # Prepare arguments for parallel processing: each worker only gets its
+    # driver's laps and telemetry, not the whole session
     print(f"Processing {len(drivers)} drivers in parallel...")
-    driver_args = [(driver_no, session, driver_codes[driver_no]) for driver_no in drivers]
-    
-    num_processes = min(cpu_count(), len(drivers))
-    
-    with Pool(processes=num_processes) as pool:
-        results = pool.map(_process_single_driver, driver_args)
+    driver_args = []
+    for driver_no in drivers:
+        driver_slice = _driver_slice(session, driver_no)
+        if driver_slice is None:
+            print(f"No laps or telemetry for driver: {driver_codes[driver_no]}, skipping")
+            continue
+        driver_args.append((driver_codes[driver_no], *driver_slice))
+
+    results = _map_drivers(pool, _process_single_driver, driver_args)
     
     # Process results
     for result in results:
@@ -418,165 +619,89 @@ def get_race_telemetry(session, session_type='R'):
         except Exception as e:
             print(f"Weather data could not be processed: {e}")
 
-    # 5. Build the frames + LIVE LEADERBOARD
-    frames = []
+    # 5. Build the columnar frame store + LIVE LEADERBOARD
     num_frames = len(timeline)
-
-    # Pre-extract data references for faster access
     driver_codes = list(resampled_data.keys())
-    driver_arrays = {code: resampled_data[code] for code in driver_codes}
-
-    # Track previous values for smoothing
-    prev_race_progress = {code: 0.0 for code in driver_codes}
-    prev_lap = {code: 1 for code in driver_codes}
-    prev_projected_dist = {code: 0.0 for code in driver_codes}
-
-    for i in range(num_frames):
-        t = timeline[i]
-        snapshot = []
-        for code in driver_codes:
-            d = driver_arrays[code]
-            x = float(d["x"][i])
-            y = float(d["y"][i])
-            lap = int(round(d["lap"][i]))
-
-            # Project the car's XY position onto the track reference to get accurate distance
-            projected_dist = _project_to_reference(x, y, ref_xs, ref_ys, cumulative_dists)
-
-            # Calculate race progress: (lap - 1) * track_length + projected_distance
-            # This gives us cumulative distance across laps using accurate track position
-            race_progress = (max(lap, 1) - 1) * track_length + projected_dist
-
-            # Smoothing: only smooth out very small GPS noise (< 10m backward jumps)
-            # Larger changes are likely real position changes (overtakes, etc.)
-            if race_progress < prev_race_progress[code]:
-                backward_jump = prev_race_progress[code] - race_progress
-
-                # Check if this is a lap completion (lap incremented AND we're near start of track)
-                is_lap_completion = (lap > prev_lap[code]) and (projected_dist < 0.3 * track_length)
-
-                # Also check if projected_dist wrapped around (was near end, now near start)
-                is_distance_wrap = (prev_projected_dist[code] > 0.7 * track_length) and (projected_dist < 0.3 * track_length)
-
-                if is_lap_completion or is_distance_wrap:
-                    # Legitimate lap completion - allow the calculated value
-                    pass
-                elif backward_jump < 10.0:
-                    # Small backward jump (GPS noise) - smooth it with minimal increment
-                    race_progress = prev_race_progress[code] + 1.0
-                else:
-                    # Large backward jump - likely real (being overtaken, off track, etc.) - allow it
-                    pass
-
-            prev_race_progress[code] = race_progress
-            prev_lap[code] = lap
-            prev_projected_dist[code] = projected_dist
-
-            snapshot.append({
-                "code": code,
-                "dist": float(d["dist"][i]),  # Keep original for reference
-                "race_progress": race_progress,  # Use this for sorting
-                "x": x,
-                "y": y,
-                "lap": lap,
-                "rel_dist": float(d["rel_dist"][i]),
-                "tyre": float(d["tyre"][i]),
-                "speed": float(d['speed'][i]),
-                "gear": int(d['gear'][i]),
-                "drs": int(d['drs'][i]),
-                "throttle": float(d['throttle'][i]),
-                "brake": float(d['brake'][i]),
-            })
-
-        # If for some reason we have no drivers at this instant
-        if not snapshot:
-            continue
-
-        # Mark that we've processed the first frame
-        first_frame = False
-
-        # 5b. Sort by race progress calculated from XY projection
-        # This uses accurate track position from XY coordinates projected onto the track centerline
-        # Formula: race_progress = (lap - 1) * track_length + projected_distance_on_track
-        snapshot.sort(key=lambda r: r["race_progress"], reverse=True)
-
-        leader = snapshot[0]
-        leader_lap = leader["lap"]
-
-        # TODO: This 5c. step seems futile currently as we are not using gaps anywhere, and it doesn't even comput the gaps. I think I left this in when removing the "gaps" feature that was half-finished during the initial development.
-
-        # 5c. Compute gap to car in front in SECONDS
-        frame_data = {}
-
-        for idx, car in enumerate(snapshot):
-            code = car["code"]
-            position = idx + 1
-
-            # include speed, gear, drs_active in frame driver dict
-            frame_data[code] = {
-                "x": car["x"],
-                "y": car["y"],
-                "dist": car["race_progress"],  # Use projected race progress for accurate positions
-                "lap": car["lap"],
-                "rel_dist": round(car["rel_dist"], 4),
-                "tyre": car["tyre"],
-                "position": position,
-                "speed": car['speed'],
-                "gear": car['gear'],
-                "drs": car['drs'],
-                "throttle": car['throttle'],
-                "brake": car['brake'],
-            }
-
-        weather_snapshot = {}
-        if weather_resampled:
-            try:
-                wt = weather_resampled
-                rain_val = wt["rainfall"][i] if wt.get("rainfall") is not None else 0.0
-                weather_snapshot = {
-                    "track_temp": float(wt["track_temp"][i]) if wt.get("track_temp") is not None else None,
-                    "air_temp": float(wt["air_temp"][i]) if wt.get("air_temp") is not None else None,
-                    "humidity": float(wt["humidity"][i]) if wt.get("humidity") is not None else None,
-                    "wind_speed": float(wt["wind_speed"][i]) if wt.get("wind_speed") is not None else None,
-                    "wind_direction": float(wt["wind_direction"][i]) if wt.get("wind_direction") is not None else None,
-                    "rain_state": "RAINING" if rain_val and rain_val >= 0.5 else "DRY",
-                }
-            except Exception as e:
-                print(f"Failed to attach weather data to frame {i}: {e}")
-
-        frame_payload = {
-            "t": round(t, 3),
-            "lap": leader_lap,   # leader's lap at this time
-            "drivers": frame_data,
-        }
-        if weather_snapshot:
-            frame_payload["weather"] = weather_snapshot
+    num_drivers = len(driver_codes)
+
+    # Lap numbers are rounded once here and stored as integers
+    laps = np.vstack([np.round(resampled_data[code]["lap"]) for code in driver_codes]).astype(np.int16)
+
+    # Project every driver's whole trajectory onto the track reference in one pass
+    projected_dists = np.vstack([
+        track_index.project(resampled_data[code]["x"], resampled_data[code]["y"])
+        for code in driver_codes
+    ])
+
+    # Race progress per driver, with GPS noise smoothed out
+    race_progress_all = np.vstack([
+        _smooth_race_progress(laps[j], projected_dists[j], track_length)
+        for j in range(num_drivers)
+    ])
+
+    # 5b. Rank by race progress calculated from XY projection, for every frame at once
+    # This uses accurate track position from XY coordinates projected onto the track centerline
+    # Formula: race_progress = (lap - 1) * track_length + projected_distance_on_track
+    # A stable sort on the negated progress keeps tied drivers in their original order
+    order = np.argsort(-race_progress_all, axis=0, kind="stable")
+
+    # order[k, i] is the row of the driver in position k + 1 at frame i
+    positions = np.empty((num_drivers, num_frames), dtype=np.int8)
+    np.put_along_axis(positions, order, np.arange(1, num_drivers + 1, dtype=np.int8)[:, None], axis=0)
+
+    # leader's lap at each frame
+    leader_laps = np.take_along_axis(laps, order[:1], axis=0)[0]
+
+    def _stack(field):
+        return np.vstack([resampled_data[code][field] for code in driver_codes])
+
+    # Frames are only built as dicts when a slice of them is requested
+    telemetry = RaceFrameStore.from_arrays(
+        timeline=timeline,
+        driver_codes=driver_codes,
+        columns={
+            "x": _stack("x"),
+            "y": _stack("y"),
+            "dist": race_progress_all,  # Use projected race progress for accurate positions
+            "lap": laps,
+            "rel_dist": _stack("rel_dist"),
+            "tyre": np.round(_stack("tyre")).astype(np.int8),
+            "position": positions,
+            "speed": _stack("speed"),
+            "gear": _stack("gear").astype(np.int8),
+            "drs": _stack("drs").astype(np.int8),
+            "throttle": _stack("throttle"),
+            "brake": _stack("brake"),
+        },
+        leader_lap=leader_laps,
+        weather=weather_resampled,
+    )
 
-        frames.append(frame_payload)
     print("completed telemetry extraction...")
     print("Saving to cache file...")
     # If computed_data/ directory doesn't exist, create it
     if not os.path.exists("computed_data"):
         os.makedirs("computed_data")
 
-    # Save using pickle (10-100x faster than JSON)
-    with open(f"computed_data/{event_name}_{cache_suffix}_telemetry.pkl", "wb") as f:
-        pickle.dump({
-            "frames": frames,
-            "driver_colors": get_driver_colors(session),
-            "track_statuses": formatted_track_statuses,
-            "total_laps": int(max_lap_number),
-        }, f, protocol=pickle.HIGHEST_PROTOCOL)
-
-    print("Saved Successfully!")
-    print("The replay should begin in a new window shortly")
-    return {
-        "frames": frames,
+    race_data = {
+        "telemetry": telemetry,
+        # Decimated overview levels, aggregated from the same arrays
+        "pyramid": TelemetryPyramid.build(telemetry, FPS),
+        "frame_rate": FPS,
         "driver_colors": get_driver_colors(session),
         "track_statuses": formatted_track_statuses,
         "total_laps": int(max_lap_number),
     }
 
+    # Save as memory-mappable arrays so pages can be read without loading the whole race
+    save_race_telemetry(telemetry_dir, race_data)
+
+    print("Saved Successfully!")
+    print("The replay should begin in a new window shortly")
+
+    # Hand back the memory-mapped copy so the computed arrays aren't kept resident
+    return load_race_telemetry(telemetry_dir)
+
 
 def get_qualifying_results(session):
 
@@ -609,17 +734,76 @@ def get_qualifying_results(session):
         })
     return qualifying_data
 
-def get_driver_quali_telemetry(session, driver_code: str, quali_segment: str):
+QUALI_SEGMENTS = ("Q1", "Q2", "Q3")
 
-    # Split Q1/Q2/Q3 sections
-    q1, q2, q3 = session.laps.split_qualifying_sessions()
+# Q1/Q2/Q3 laps of each loaded session, split once
+_quali_segments = weakref.WeakKeyDictionary()
 
-    segments = {
-        "Q1": q1,
-        "Q2": q2,
-        "Q3": q3
-    }
+def _quali_segment_laps(session):
+    """{segment: Laps or None} for a qualifying session, split once per session."""
+    segments = _quali_segments.get(session)
+    if segments is None:
+        segments = dict(zip(QUALI_SEGMENTS, session.laps.split_qualifying_sessions()))
+        _quali_segments[session] = segments
+    return segments
+
+def _fastest_quali_laps(segments):
+    """
+    Every driver's fastest lap in every segment, in one grouped pass.
+
+    Picks the same lap as Laps.pick_fastest(): the quickest lap marked as a
+    personal best, the first one clocked on a tie. Returns a plain DataFrame
+    of those laps with a "Segment" column.
+    """
+    laps = [
+        pd.DataFrame(segment_laps).assign(Segment=segment)
+        for segment, segment_laps in segments.items()
+        if segment_laps is not None
+    ]
+    if not laps:
+        return pd.DataFrame(columns=["Segment", "DriverNumber", "LapTime"])
+
+    laps = pd.concat(laps, ignore_index=True)
+    laps = laps[(laps["IsPersonalBest"] == True) & laps["LapTime"].notna()]  # noqa: E712
+    fastest = laps.groupby(["Segment", "DriverNumber"], sort=False)["LapTime"].idxmin()
+    return laps.loc[fastest.to_numpy()]
+
+def _quali_driver_slice(session, driver_no, fastest_laps):
+    """
+    A driver's fastest qualifying laps and just the telemetry around them.
 
+    Like _driver_slice, but car and position data are cut down to each lap
+    plus the one padding sample either side that _lap_telemetry uses. A
+    driver with no telemetry gets no laps, so every segment comes out empty.
+    """
+    clock = _SessionClock(session.t0_date)
+    car_data = session.car_data.get(driver_no)
+    pos_data = session.pos_data.get(driver_no)
+    if car_data is None or pos_data is None:
+        empty = Telemetry(session=clock, driver=driver_no)
+        return pd.DataFrame(fastest_laps.iloc[:0]), empty, empty
+
+    lap_starts = fastest_laps["LapStartTime"].to_numpy()
+    lap_ends = fastest_laps["Time"].to_numpy()
+
+    def _around_laps(telemetry):
+        # Rows within any of the laps, plus one padding row either side
+        t = telemetry["SessionTime"].to_numpy()
+        lo = np.maximum(np.searchsorted(t, lap_starts, side='left') - 1, 0)
+        hi = np.searchsorted(t, lap_ends, side='right') + 1
+        keep = np.zeros(len(t), dtype=bool)
+        for start, stop in zip(lo, hi):
+            keep[start:stop] = True
+        return Telemetry(telemetry.loc[keep].reset_index(drop=True), session=clock, driver=driver_no)
+
+    return (
+        pd.DataFrame(fastest_laps),
+        _around_laps(car_data),
+        _around_laps(pos_data),
+    )
+
+def _pick_quali_lap(segments, driver_code: str, quali_segment: str):
+    """Fastest lap of a driver in one segment of {segment: Laps or None}."""
     # Validate the segment
     if quali_segment not in segments:
         raise ValueError("quali_segment must be 'Q1', 'Q2', or 'Q3'")
@@ -636,12 +820,57 @@ def get_driver_quali_telemetry(session, driver_code: str, quali_segment: str):
     # Pick fastest lap
     fastest_lap = driver_laps.pick_fastest()
 
-    # Extract telemetry with xyz coordinates
-
     if fastest_lap is None:
         raise ValueError(f"No valid laps for driver '{driver_code}' in {quali_segment}")
 
-    telemetry = fastest_lap.get_telemetry()
+    return fastest_lap
+
+def get_driver_quali_telemetry(session, driver_code: str, quali_segment: str):
+
+    # Split Q1/Q2/Q3 sections
+    segments = _quali_segment_laps(session)
+
+    fastest_lap = _pick_quali_lap(segments, driver_code, quali_segment)
+
+    # Extract telemetry with xyz coordinates
+    driver_no = fastest_lap["DriverNumber"]
+    telemetry = _lap_telemetry(fastest_lap, session.car_data[driver_no], session.pos_data[driver_no])
+
+    return _build_quali_lap_frames(fastest_lap, telemetry, session.track_status, session.weather_data)
+
+def get_quali_lap_telemetry(session, driver_code: str, quali_segment: str, session_type='Q'):
+    """
+    One driver's fastest-lap telemetry in one segment, computed on its own.
+
+    Answers from the per-lap cache (which get_quali_telemetry fills as it
+    goes) and otherwise computes just this lap and saves it there. A driver
+    without a valid lap in the segment gets empty frames, as in
+    get_quali_telemetry.
+
+    Raises:
+        ValueError: Unknown segment or a driver who isn't in the session
+    """
+    if quali_segment not in QUALI_SEGMENTS:
+        raise ValueError("quali_segment must be 'Q1', 'Q2', or 'Q3'")
+    if driver_code not in {session.get_driver(num)["Abbreviation"] for num in session.drivers}:
+        raise ValueError(f"Driver '{driver_code}' did not take part in this session")
+
+    path = quali_lap_path(session, session_type, driver_code, quali_segment)
+    if "--refresh-data" not in sys.argv:
+        cached = _load_quali_lap(path)
+        if cached is not None:
+            return cached
+
+    try:
+        segment_telemetry = get_driver_quali_telemetry(session, driver_code, quali_segment)
+    except ValueError:
+        segment_telemetry = {"frames": [], "track_statuses": []}
+
+    _save_pickle(path, segment_telemetry)
+    return segment_telemetry
+
+def _build_quali_lap_frames(fastest_lap, telemetry, track_status, weather_df):
+    """Resample a qualifying lap's telemetry into playback frames."""
 
     # Guard: if telemetry has no time data, return empty
     if telemetry is None or telemetry.empty or 'Time' not in telemetry or len(telemetry) == 0:
@@ -730,8 +959,6 @@ def get_driver_quali_telemetry(session, driver_code: str, quali_segment: str):
         "drs": drs_resampled,
     }
 
-    track_status = session.track_status
-
     formatted_track_statuses = []
 
     for status in track_status.to_dict('records'):
@@ -752,7 +979,6 @@ def get_driver_quali_telemetry(session, driver_code: str, quali_segment: str):
 
     # 4.1. Resample weather data onto the same timeline for playback
     weather_resampled = None
-    weather_df = getattr(session, "weather_data", None)
     if weather_df is not None and not weather_df.empty:
         try:
             weather_times = weather_df["Time"].dt.total_seconds().to_numpy() - global_t_min
@@ -861,28 +1087,42 @@ def get_driver_quali_telemetry(session, driver_code: str, quali_segment: str):
 
 def _process_quali_driver(args):
     """Process qualifying telemetry data for a single driver - must be top-level for multiprocessing"""
-    session, driver_code = args
+    driver_code, fastest_laps, car_data, pos_data, track_status, weather_df, lap_paths, use_cached = args
 
     print(f"Getting qualifying telemetry for driver: {driver_code}")
 
+    # The driver's fastest lap per segment, picked by _fastest_quali_laps
+    fastest_laps = {lap["Segment"]: lap for _, lap in _worker_laps(fastest_laps, car_data).iterlaps()}
+
     driver_telemetry_data = {}
 
     max_speed = 0.0
     min_speed = 0.0
 
-    for segment in ["Q1", "Q2", "Q3"]:
-        try:
-            segment_telemetry = get_driver_quali_telemetry(session, driver_code, segment)
-            driver_telemetry_data[segment] = segment_telemetry
-
-            # Update global max/min speed
-            if segment_telemetry["max_speed"] > max_speed:
-                max_speed = segment_telemetry["max_speed"]
-            if segment_telemetry["min_speed"] < min_speed or min_speed == 0.0:
-                min_speed = segment_telemetry["min_speed"]
-
-        except ValueError:
-            driver_telemetry_data[segment] = {"frames": [], "track_statuses": []}
+    for segment in QUALI_SEGMENTS:
+        # Laps already computed on demand are reused; the rest are saved to the
+        # per-lap cache as soon as they're done, so they can be served early
+        segment_telemetry = _load_quali_lap(lap_paths[segment]) if use_cached else None
+        if segment_telemetry is None:
+            try:
+                fastest_lap = fastest_laps.get(segment)
+                if fastest_lap is None:
+                    raise ValueError(f"No valid laps for driver '{driver_code}' in {segment}")
+                telemetry = _lap_telemetry(fastest_lap, car_data, pos_data)
+                segment_telemetry = _build_quali_lap_frames(fastest_lap, telemetry, track_status, weather_df)
+            except ValueError:
+                segment_telemetry = {"frames": [], "track_statuses": []}
+            _save_pickle(lap_paths[segment], segment_telemetry)
+
+        driver_telemetry_data[segment] = segment_telemetry
+
+        # Update global max/min speed
+        if "max_speed" not in segment_telemetry:
+            continue
+        if segment_telemetry["max_speed"] > max_speed:
+            max_speed = segment_telemetry["max_speed"]
+        if segment_telemetry["min_speed"] < min_speed or min_speed == 0.0:
+            min_speed = segment_telemetry["min_speed"]
 
     print(f"Finished processing qualifying telemetry for driver: {driver_code}")
         
@@ -894,8 +1134,9 @@ def _process_quali_driver(args):
     }
 
 
-def get_quali_telemetry(session, session_type='Q'):
+def get_quali_telemetry(session, session_type='Q', pool=None):
     # This function is going to get the results from qualifying and the telemetry for each drivers' fastest laps in each qualifying segment
+    # (pool: see get_race_telemetry)
 
     # The structure of the returned data will be:
     # {
@@ -910,19 +1151,15 @@ def get_quali_telemetry(session, session_type='Q'):
     #   }
     # }
 
-    event_name = str(session).replace(' ', '_')
     cache_suffix = 'sprintquali' if session_type == 'SQ' else 'quali'
 
     # Check if this data has already been computed
-    try:
-        if "--refresh-data" not in sys.argv:
-            with open(f"computed_data/{event_name}_{cache_suffix}_telemetry.pkl", "rb") as f:
-                data = pickle.load(f)
-                print(f"Loaded precomputed {cache_suffix} telemetry data.")
-                print("The replay should begin in a new window shortly!")
-                return data
-    except FileNotFoundError:
-        pass  # Need to compute from scratch
+    if "--refresh-data" not in sys.argv:
+        data = load_precomputed_quali_telemetry(session, session_type)
+        if data is not None:
+            print(f"Loaded precomputed {cache_suffix} telemetry data.")
+            print("The replay should begin in a new window shortly!")
+            return data
 
     qualifying_results = get_qualifying_results(session)
 
@@ -938,14 +1175,29 @@ def get_quali_telemetry(session, session_type='Q'):
 
     telemetry_data = {}
 
-    driver_args = [(session, driver_codes[driver_no]) for driver_no in session.drivers]
+    # Split Q1/Q2/Q3 once and pick every fastest lap in one pass; each worker
+    # only gets its driver's fastest laps and the telemetry around them
+    fastest_laps = _fastest_quali_laps(_quali_segment_laps(session))
+    fastest_by_driver = dict(tuple(fastest_laps.groupby("DriverNumber", sort=False)))
+
+    use_cached = "--refresh-data" not in sys.argv
+
+    driver_args = []
+    for driver_no in session.drivers:
+        driver_code = driver_codes[driver_no]
+        own_laps = fastest_by_driver.get(driver_no, fastest_laps.iloc[:0])
+        lap_paths = {
+            segment: quali_lap_path(session, session_type, driver_code, segment)
+            for segment in QUALI_SEGMENTS
+        }
+        driver_args.append((
+            driver_code, *_quali_driver_slice(session, driver_no, own_laps),
+            session.track_status, session.weather_data, lap_paths, use_cached,
+        ))
 
     print(f"Processing {len(session.drivers)} drivers in parallel...")
-    
-    num_processes = min(cpu_count(), len(session.drivers))
-    
-    with Pool(processes=num_processes) as pool:
-        results = pool.map(_process_quali_driver, driver_args)
+
+    results = _map_drivers(pool, _process_quali_driver, driver_args)
     for result in results:
         driver_code = result["driver_code"]
         telemetry_data[driver_code] = result["driver_telemetry_data"]
@@ -955,18 +1207,14 @@ def get_quali_telemetry(session, session_type='Q'):
         if result["min_speed"] < min_speed or min_speed == 0.0:
             min_speed = result["min_speed"]
 
-    # Save to the compute_data directory
-
-    if not os.path.exists("computed_data"):
-        os.makedirs("computed_data")
-
-    with open(f"computed_data/{event_name}_{cache_suffix}_telemetry.pkl", "wb") as f:
-        pickle.dump({
-            "results": qualifying_results,
-            "telemetry": telemetry_data,
-            "max_speed": max_speed,
-            "min_speed": min_speed,
-        }, f, protocol=pickle.HIGHEST_PROTOCOL)
+    # Save to the compute_data directory; single laps are served from this
+    # file while it may still be being written
+    _save_pickle(quali_telemetry_path(session, session_type), {
+        "results": qualifying_results,
+        "telemetry": telemetry_data,
+        "max_speed": max_speed,
+        "min_speed": min_speed,
+    })
 
     return {
         "results": qualifying_results,
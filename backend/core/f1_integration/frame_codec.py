@@ -0,0 +1,299 @@
+"""Compact binary encodings of race telemetry pages.
+
+JSON frames repeat every key name for every driver in every frame. The binary
+encodings send each field once, as packed little-endian arrays sliced
+straight from the RaceFrameStore columns. Both share one container:
+
+    magic (4 bytes)                 b"F1FB" or b"F1FD"
+    uint32 (little-endian)          length of the JSON header in bytes
+    JSON header (UTF-8)             page metadata plus an array table
+    padding to an 8-byte boundary
+    array data                      each array 8-byte aligned, in table order
+
+Each array table entry is {"name", "dtype", "shape", "offset"}, with offset
+counted from the start of the array data. The timeline ("t"), leader lap
+("lap") and weather ("weather_<name>") arrays have shape (n_frames,).
+
+Frames encoding (F1FB, FRAMES_MEDIA_TYPE): driver fields ("col_<field>") have
+shape (n_drivers, n_frames) with rows in header["driver_codes"] order.
+Values are not rounded, unlike the JSON frames.
+
+Delta encoding (F1FD, DELTA_MEDIA_TYPE): driver fields are carried in a
+"records" byte array, one record per frame, for viewers on slow links.
+Fields with decimals (x, y, dist, speed, ...) are quantized to integers at
+the precision of the JSON frames. Every keyframe_interval-th frame is a
+keyframe holding every field in full. The frames in between are deltas that
+only carry the fields that changed, as int16 offsets for quantized fields
+and new values for integer fields. Records are laid out as:
+
+    uint8   kind                    1 = keyframe, 0 = delta
+    uint16  changed mask            bit i set = header["fields"][i] follows
+    per field in the mask, n_drivers values of:
+        quantized field: int32 (keyframe) or int16 offset (delta)
+        integer field:   the field's storage dtype
+
+A frame whose offsets don't fit in int16 is sent as a keyframe.
+decode_delta_page is the reference decoder.
+"""
+import json
+import struct
+
+import numpy as np
+
+from frame_store import DRIVER_FIELDS
+
+FRAMES_MEDIA_TYPE = "application/vnd.f1live.frames"
+FRAMES_MAGIC = b"F1FB"
+FRAMES_FORMAT_VERSION = 1
+
+DELTA_MEDIA_TYPE = "application/vnd.f1live.delta-frames"
+DELTA_MAGIC = b"F1FD"
+DELTA_FORMAT_VERSION = 1
+DEFAULT_KEYFRAME_INTERVAL = 25
+
+_ALIGNMENT = 8
+_KEYFRAME = 1
+_DELTA = 0
+_INT16_MIN, _INT16_MAX = np.iinfo(np.int16).min, np.iinfo(np.int16).max
+
+
+def _padding(length):
+    return -length % _ALIGNMENT
+
+
+def _pack(magic, header, arrays):
+    """Build a container from a header dict and (name, array) pairs."""
+    table = []
+    blocks = []
+    offset = 0
+    for name, values in arrays:
+        # Little-endian, C-ordered copy of just this page's slice
+        values = np.ascontiguousarray(values, dtype=values.dtype.newbyteorder("<"))
+        table.append({
+            "name": name,
+            "dtype": values.dtype.str,
+            "shape": list(values.shape),
+            "offset": offset,
+        })
+        pad = _padding(values.nbytes)
+        blocks.append(values.tobytes())
+        blocks.append(b"\0" * pad)
+        offset += values.nbytes + pad
+
+    header_bytes = json.dumps({**header, "arrays": table}, separators=(",", ":")).encode()
+    prefix_length = len(magic) + 4 + len(header_bytes)
+    return b"".join([
+        magic,
+        struct.pack("<I", len(header_bytes)),
+        header_bytes,
+        b"\0" * _padding(prefix_length),
+        *blocks,
+    ])
+
+
+def _unpack(payload, magic, version):
+    """Split a container into (header, arrays of read-only views over payload)."""
+    payload = memoryview(payload)
+    if bytes(payload[:4]) != magic:
+        raise ValueError("Not an F1 frames payload")
+
+    (header_length,) = struct.unpack_from("<I", payload, 4)
+    header_end = 8 + header_length
+    header = json.loads(bytes(payload[8:header_end]))
+    if header.get("version") != version:
+        raise ValueError(f"Unsupported frames format version: {header.get('version')}")
+
+    data_start = header_end + _padding(header_end)
+    arrays = {}
+    for entry in header["arrays"]:
+        dtype = np.dtype(entry["dtype"])
+        count = int(np.prod(entry["shape"], dtype=np.int64))
+        values = np.frombuffer(payload, dtype=dtype, count=count, offset=data_start + entry["offset"])
+        arrays[entry["name"]] = values.reshape(entry["shape"])
+
+    return header, arrays
+
+
+def _page_bounds(telemetry, start, stop):
+    start, stop, _ = slice(start, stop).indices(len(telemetry))
+    return start, max(start, stop)
+
+
+def _shared_arrays(telemetry, start, stop):
+    arrays = [("t", telemetry.timeline[start:stop]), ("lap", telemetry.leader_lap[start:stop])]
+    arrays += [(f"weather_{name}", values[start:stop]) for name, values in telemetry.weather.items()]
+    return arrays
+
+
+def encode_frame_page(telemetry, start, stop, metadata=None, drivers=None, fields=None):
+    """
+    Encode frames telemetry[start:stop] as bytes.
+
+    Args:
+        telemetry: RaceFrameStore to slice
+        start, stop: Frame bounds of the page
+        metadata: Extra JSON-serialisable entries for the header
+            (e.g. driver_colors, track_statuses, total_laps)
+        drivers, fields: Optional projection (see RaceFrameStore.select)
+    """
+    rows, fields = telemetry.select(drivers, fields)
+    start, stop = _page_bounds(telemetry, start, stop)
+
+    arrays = _shared_arrays(telemetry, start, stop)
+    arrays += [(f"col_{field}", telemetry.columns[field][rows, start:stop]) for field in fields]
+
+    header = dict(metadata or {})
+    header.update({
+        "version": FRAMES_FORMAT_VERSION,
+        "start_frame": start,
+        "end_frame": stop,
+        "num_frames": stop - start,
+        "driver_codes": telemetry.driver_codes if drivers is None else list(drivers),
+    })
+    return _pack(FRAMES_MAGIC, header, arrays)
+
+
+def decode_frame_page(payload):
+    """
+    Decode bytes from encode_frame_page.
+
+    Returns (header, arrays) where arrays maps each name in the array table to
+    a read-only NumPy view over payload.
+    """
+    return _unpack(payload, FRAMES_MAGIC, FRAMES_FORMAT_VERSION)
+
+
+def encode_delta_page(telemetry, start, stop, metadata=None, drivers=None, fields=None,
+                      keyframe_interval=DEFAULT_KEYFRAME_INTERVAL):
+    """
+    Encode frames telemetry[start:stop] with keyframes and quantized deltas.
+
+    Takes the same arguments as encode_frame_page, plus the number of frames
+    between keyframes. The first frame of a page is always a keyframe, so
+    every page decodes on its own.
+    """
+    if keyframe_interval < 1:
+        raise ValueError("keyframe_interval must be at least 1")
+
+    rows, fields = telemetry.select(drivers, fields)
+    start, stop = _page_bounds(telemetry, start, stop)
+    num_frames = stop - start
+
+    # Quantized fields as int64 (so differences can't overflow), others as stored
+    values = {}
+    scales = {}
+    for field in fields:
+        column = np.asarray(telemetry.columns[field][rows, start:stop])
+        decimals = DRIVER_FIELDS[field][1]
+        if decimals is None:
+            values[field] = column
+        else:
+            scales[field] = 10 ** decimals
+            values[field] = np.rint(np.nan_to_num(column.astype(np.float64)) * scales[field]).astype(np.int64)
+
+    # Which fields change at each frame, and which frames must be keyframes
+    is_key = np.zeros(num_frames, dtype=bool)
+    is_key[::keyframe_interval] = True
+    changed = {}
+    for field in fields:
+        steps = np.diff(values[field], axis=1)
+        changed[field] = np.concatenate([[True], (steps != 0).any(axis=0)])
+        if field in scales:
+            overflow = ((steps < _INT16_MIN) | (steps > _INT16_MAX)).any(axis=0)
+            is_key[1:] |= overflow
+
+    records = []
+    for i in range(num_frames):
+        if is_key[i]:
+            mask = (1 << len(fields)) - 1
+            blocks = [
+                values[field][:, i].astype("<i4" if field in scales else values[field].dtype.newbyteorder("<"))
+                for field in fields
+            ]
+        else:
+            mask = 0
+            blocks = []
+            for bit, field in enumerate(fields):
+                if not changed[field][i]:
+                    continue
+                mask |= 1 << bit
+                if field in scales:
+                    blocks.append((values[field][:, i] - values[field][:, i - 1]).astype("<i2"))
+                else:
+                    blocks.append(values[field][:, i].astype(values[field].dtype.newbyteorder("<")))
+
+        records.append(struct.pack("<BH", _KEYFRAME if is_key[i] else _DELTA, mask))
+        records.extend(block.tobytes() for block in blocks)
+
+    arrays = _shared_arrays(telemetry, start, stop)
+    arrays.append(("records", np.frombuffer(b"".join(records), dtype=np.uint8)))
+
+    header = dict(metadata or {})
+    header.update({
+        "version": DELTA_FORMAT_VERSION,
+        "start_frame": start,
+        "end_frame": stop,
+        "num_frames": num_frames,
+        "driver_codes": telemetry.driver_codes if drivers is None else list(drivers),
+        "keyframe_interval": keyframe_interval,
+        "fields": [
+            {
+                "name": field,
+                "dtype": np.dtype(DRIVER_FIELDS[field][0]).newbyteorder("<").str,
+                "scale": scales.get(field),
+            }
+            for field in fields
+        ],
+    })
+    return _pack(DELTA_MAGIC, header, arrays)
+
+
+def decode_delta_page(payload):
+    """
+    Decode bytes from encode_delta_page.
+
+    Returns (header, arrays) like decode_frame_page, with the driver fields
+    rebuilt as "col_<field>" arrays of shape (n_drivers, n_frames).
+    Quantized fields come back as float64 at the JSON frames' precision.
+    """
+    header, arrays = _unpack(payload, DELTA_MAGIC, DELTA_FORMAT_VERSION)
+    records = arrays.pop("records").tobytes()
+    num_drivers = len(header["driver_codes"])
+    num_frames = header["num_frames"]
+    fields = header["fields"]
+
+    columns = {
+        field["name"]: np.zeros(
+            (num_drivers, num_frames), dtype=np.int64 if field["scale"] else np.dtype(field["dtype"])
+        )
+        for field in fields
+    }
+
+    pos = 0
+    for i in range(num_frames):
+        kind, mask = struct.unpack_from("<BH", records, pos)
+        pos += 3
+        for bit, field in enumerate(fields):
+            name = field["name"]
+            if i > 0:
+                columns[name][:, i] = columns[name][:, i - 1]
+            if not mask & (1 << bit):
+                continue
+
+            if field["scale"]:
+                dtype = np.dtype("<i4") if kind == _KEYFRAME else np.dtype("<i2")
+            else:
+                dtype = np.dtype(field["dtype"])
+            block = np.frombuffer(records, dtype=dtype, count=num_drivers, offset=pos)
+            pos += block.nbytes
+
+            if field["scale"] and kind == _DELTA:
+                columns[name][:, i] += block
+            else:
+                columns[name][:, i] = block
+
+    for field in fields:
+        values = columns[field["name"]]
+        arrays[f"col_{field['name']}"] = values / field["scale"] if field["scale"] else values
+
+    return header, arrays
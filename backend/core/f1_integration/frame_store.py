@@ -0,0 +1,534 @@
+"""Columnar storage for resampled race telemetry.
+
+Instead of one dict per frame with a nested dict per driver, the race is held
+as one NumPy array per field with a row per driver (so every (driver, field)
+pair is a contiguous 1-D array), plus a shared timeline. Dict frames in the
+format the API has always returned are only built for the slice that is
+actually requested.
+
+A TelemetryPyramid holds decimated copies of the columns (e.g. 5 Hz, 1 Hz and
+0.1 Hz) with min/max/mean per bucket for the continuous fields, so overview
+views of a whole race don't read every 25 Hz frame.
+
+On disk a race is a directory holding one ``.npy`` file per array and a small
+``header.json``. Arrays are opened with ``np.load(mmap_mode="r")`` so serving a
+page only touches the bytes of the frames in that page, and every worker
+process shares the OS page cache instead of holding its own copy.
+"""
+import json
+import os
+import shutil
+
+import numpy as np
+
+# Per-driver fields in the order they appear in a frame's driver dict.
+# Each entry maps to (storage dtype, decimals used when building frames).
+# Decimals of None means the value is emitted as an int.
+DRIVER_FIELDS = {
+    "x": (np.float32, 2),
+    "y": (np.float32, 2),
+    "dist": (np.float32, 2),
+    "lap": (np.int16, None),
+    "rel_dist": (np.float32, 4),
+    "tyre": (np.int8, None),
+    "position": (np.int8, None),
+    "speed": (np.float32, 2),
+    "gear": (np.int8, None),
+    "drs": (np.int8, None),
+    "throttle": (np.float32, 2),
+    "brake": (np.float32, 2),
+}
+
+WEATHER_DECIMALS = 2
+
+# Levels of the telemetry pyramid in Hz, finest first. A level at the frame
+# rate itself is served straight from the race columns.
+PYRAMID_LEVELS_HZ = (25, 5, 1, 0.1)
+PYRAMID_STATS = ("min", "max", "mean")
+
+# Bump when the on-disk layout changes so stale directories are recomputed
+STORE_FORMAT_VERSION = 1
+
+HEADER_FILE = "header.json"
+
+
+def _to_lists(values, decimals):
+    """Convert a NumPy block to nested Python lists, rounding floats for clean JSON."""
+    if decimals is None:
+        return values.tolist()
+    return np.round(values.astype(np.float64), decimals).tolist()
+
+
+class RaceFrameStore:
+    """
+    Struct-of-arrays container for a race's resampled telemetry.
+
+    Attributes:
+        timeline: (n_frames,) seconds since the first sample
+        driver_codes: driver abbreviations, one per row of every column
+        columns: field name -> (n_drivers, n_frames) array
+        leader_lap: (n_frames,) lap of the race leader at each frame
+        weather: weather field name -> (n_frames,) array (may be empty)
+    """
+
+    def __init__(self, timeline, driver_codes, columns, leader_lap, weather=None):
+        self.timeline = timeline
+        self.driver_codes = list(driver_codes)
+        self.columns = columns
+        self.leader_lap = leader_lap
+        self.weather = weather or {}
+        self._driver_index = {code: i for i, code in enumerate(self.driver_codes)}
+        self._lap_starts = None
+
+    @classmethod
+    def from_arrays(cls, timeline, driver_codes, columns, leader_lap, weather=None):
+        """Build a store from float arrays, casting each column to its storage dtype."""
+        typed_columns = {}
+        for field, (dtype, decimals) in DRIVER_FIELDS.items():
+            values = np.asarray(columns[field])
+            if decimals is None and not np.issubdtype(values.dtype, np.integer):
+                raise ValueError(f"Column '{field}' must be integer-valued before storage")
+            typed_columns[field] = np.ascontiguousarray(values, dtype=dtype)
+
+        typed_weather = {
+            name: np.ascontiguousarray(values, dtype=np.float32)
+            for name, values in (weather or {}).items()
+            if values is not None
+        }
+
+        return cls(
+            timeline=np.ascontiguousarray(timeline, dtype=np.float64),
+            driver_codes=driver_codes,
+            columns=typed_columns,
+            leader_lap=np.ascontiguousarray(leader_lap, dtype=np.int16),
+            weather=typed_weather,
+        )
+
+    def __len__(self):
+        return len(self.timeline)
+
+    def select(self, drivers=None, fields=None):
+        """
+        Resolve a driver/field projection.
+
+        Args:
+            drivers: Driver codes to keep, or None for all
+            fields: Driver fields to keep, or None for all
+
+        Returns (rows, fields): the row index (a slice for all drivers) and
+        the field names in frame order.
+
+        Raises:
+            ValueError: Unknown driver code or field
+        """
+        if drivers is None:
+            rows = slice(None)
+        else:
+            unknown = [code for code in drivers if code not in self._driver_index]
+            if unknown:
+                raise ValueError(f"Unknown driver(s): {', '.join(unknown)}")
+            rows = [self._driver_index[code] for code in drivers]
+
+        if fields is None:
+            fields = list(DRIVER_FIELDS)
+        else:
+            unknown = [field for field in fields if field not in DRIVER_FIELDS]
+            if unknown:
+                raise ValueError(
+                    f"Unknown field(s): {', '.join(unknown)}; available: {', '.join(DRIVER_FIELDS)}"
+                )
+            fields = [field for field in DRIVER_FIELDS if field in fields]
+
+        return rows, fields
+
+    def frames(self, start=0, stop=None, drivers=None, fields=None):
+        """
+        Build dict frames for timeline[start:stop].
+
+        The output matches the historical frame format:
+            {"t", "lap", "drivers": {code: {...}}, "weather"?}
+        with drivers listed in race order. drivers and fields limit the driver
+        dicts to those codes and fields (see select); only the selected rows
+        of the selected columns are read.
+        """
+        rows, fields = self.select(drivers, fields)
+        start, stop, _ = slice(start, stop).indices(len(self))
+        if start >= stop:
+            return []
+
+        codes = self.driver_codes if drivers is None else list(drivers)
+        times = np.round(self.timeline[start:stop], 3).tolist()
+        leader_laps = self.leader_lap[start:stop].tolist()
+
+        # Nested [driver][frame] lists, converted once per field for the whole slice
+        values = {
+            field: _to_lists(self.columns[field][rows, start:stop], DRIVER_FIELDS[field][1])
+            for field in fields
+        }
+        # Driver rows sorted by position for each frame
+        order = np.argsort(self.columns["position"][rows, start:stop], axis=0, kind="stable").T.tolist()
+
+        weather = self._weather_lists(start, stop)
+        # Thresholded on the stored values so rounding can't flip the state
+        rainfall = self.weather.get("rainfall")
+        raining = (rainfall[start:stop] >= 0.5).tolist() if rainfall is not None else None
+
+        frames = []
+        for i in range(stop - start):
+            frame_drivers = {}
+            for row in order[i]:
+                frame_drivers[codes[row]] = {field: values[field][row][i] for field in fields}
+
+            frame_payload = {
+                "t": times[i],
+                "lap": leader_laps[i],
+                "drivers": frame_drivers,
+            }
+            if weather:
+                frame_payload["weather"] = {
+                    "track_temp": weather["track_temp"][i] if weather.get("track_temp") is not None else None,
+                    "air_temp": weather["air_temp"][i] if weather.get("air_temp") is not None else None,
+                    "humidity": weather["humidity"][i] if weather.get("humidity") is not None else None,
+                    "wind_speed": weather["wind_speed"][i] if weather.get("wind_speed") is not None else None,
+                    "wind_direction": weather["wind_direction"][i] if weather.get("wind_direction") is not None else None,
+                    "rain_state": "RAINING" if raining is not None and raining[i] else "DRY",
+                }
+
+            frames.append(frame_payload)
+
+        return frames
+
+    def frame_range_for_times(self, t_start=None, t_end=None):
+        """
+        Frame bounds [start, stop) covering timeline values in [t_start, t_end].
+
+        Either bound may be None to leave that side open.
+        """
+        start = 0 if t_start is None else int(np.searchsorted(self.timeline, t_start, side="left"))
+        stop = len(self) if t_end is None else int(np.searchsorted(self.timeline, t_end, side="right"))
+        return start, max(start, stop)
+
+    @property
+    def lap_starts(self):
+        """
+        Lap -> frame index: lap_starts[lap] is the first frame the leader is on lap or later.
+
+        Built once from leader_lap (its running maximum, so a lead change at
+        the line can't make a lap start twice) and reused for every lookup.
+        """
+        if self._lap_starts is None:
+            if len(self):
+                leader_lap = np.maximum.accumulate(np.asarray(self.leader_lap, dtype=np.int64))
+                laps = np.arange(max(int(leader_lap[-1]), 0) + 2)
+                self._lap_starts = np.searchsorted(leader_lap, laps, side="left")
+            else:
+                self._lap_starts = np.zeros(1, dtype=np.intp)
+        return self._lap_starts
+
+    def frame_range_for_laps(self, lap_start=None, lap_end=None):
+        """
+        Frame bounds [start, stop) of leader laps lap_start..lap_end inclusive.
+
+        Either bound may be None to leave that side open.
+        """
+        lap_starts = self.lap_starts
+        last = len(lap_starts) - 1
+
+        start = 0 if lap_start is None else int(lap_starts[min(max(lap_start, 0), last)])
+        if lap_end is None or lap_end + 1 > last:
+            stop = len(self)
+        else:
+            stop = int(lap_starts[max(lap_end + 1, 0)])
+        return start, max(start, stop)
+
+    def frame_range(self, t_start=None, t_end=None, lap_start=None, lap_end=None):
+        """
+        Frame bounds [start, stop) for time bounds or lap bounds (not both).
+
+        With no bounds this is the whole race.
+        """
+        by_time = t_start is not None or t_end is not None
+        by_lap = lap_start is not None or lap_end is not None
+        if by_time and by_lap:
+            raise ValueError("Use either time bounds or lap bounds, not both")
+        if by_lap:
+            return self.frame_range_for_laps(lap_start, lap_end)
+        return self.frame_range_for_times(t_start, t_end)
+
+    def _weather_lists(self, start, stop):
+        return {
+            name: _to_lists(values[start:stop], WEATHER_DECIMALS)
+            for name, values in self.weather.items()
+        }
+
+
+class PyramidLevel:
+    """
+    One decimated level of a race: the frames grouped into fixed-size buckets.
+
+    Attributes:
+        hz: Buckets per second
+        bucket_frames: Frames per bucket (the last bucket may be shorter)
+        timeline: (n_buckets,) time of the first frame of each bucket
+        leader_lap: (n_buckets,) highest leader lap within each bucket
+        stats: continuous field -> {"min", "max", "mean"} -> (n_drivers, n_buckets)
+        values: integer field -> (n_drivers, n_buckets) value at the end of each bucket
+    """
+
+    def __init__(self, hz, bucket_frames, timeline, leader_lap, stats, values):
+        self.hz = hz
+        self.bucket_frames = bucket_frames
+        self.timeline = timeline
+        self.leader_lap = leader_lap
+        self.stats = stats
+        self.values = values
+
+    def __len__(self):
+        return len(self.timeline)
+
+    @classmethod
+    def from_store(cls, store, hz, bucket_frames):
+        """Aggregate a RaceFrameStore into buckets of bucket_frames frames."""
+        continuous = [field for field, (_, decimals) in DRIVER_FIELDS.items() if decimals is not None]
+        discrete = [field for field, (_, decimals) in DRIVER_FIELDS.items() if decimals is None]
+
+        # Frame rate level: every bucket is one frame, so reuse the columns
+        if bucket_frames == 1:
+            return cls(
+                hz, 1, store.timeline, store.leader_lap,
+                stats={field: {stat: store.columns[field] for stat in PYRAMID_STATS} for field in continuous},
+                values={field: store.columns[field] for field in discrete},
+            )
+
+        num_frames = len(store)
+        starts = np.arange(0, num_frames, bucket_frames)
+        ends = np.append(starts[1:], num_frames)
+
+        if num_frames == 0:
+            empty = np.zeros((len(store.driver_codes), 0), dtype=np.float32)
+            return cls(
+                hz, bucket_frames, np.zeros(0), np.zeros(0, dtype=np.int16),
+                stats={field: {stat: empty for stat in PYRAMID_STATS} for field in continuous},
+                values={field: empty.astype(DRIVER_FIELDS[field][0]) for field in discrete},
+            )
+
+        counts = ends - starts
+        stats = {}
+        for field in continuous:
+            column = np.asarray(store.columns[field])
+            stats[field] = {
+                "min": np.minimum.reduceat(column, starts, axis=1),
+                "max": np.maximum.reduceat(column, starts, axis=1),
+                "mean": (np.add.reduceat(column, starts, axis=1, dtype=np.float64) / counts).astype(np.float32),
+            }
+
+        return cls(
+            hz, bucket_frames,
+            timeline=np.asarray(store.timeline)[starts],
+            leader_lap=np.maximum.reduceat(np.asarray(store.leader_lap), starts),
+            stats=stats,
+            values={field: np.asarray(store.columns[field])[:, ends - 1] for field in discrete},
+        )
+
+    def bucket_range_for_times(self, t_start=None, t_end=None):
+        """Bucket bounds [start, stop) of the buckets overlapping [t_start, t_end]."""
+        start = 0
+        if t_start is not None:
+            start = max(int(np.searchsorted(self.timeline, t_start, side="right")) - 1, 0)
+        stop = len(self) if t_end is None else int(np.searchsorted(self.timeline, t_end, side="right"))
+        return start, max(start, stop)
+
+    def overview(self, start=0, stop=None, rows=slice(None), fields=None):
+        """
+        Columnar dict of buckets [start, stop) for the selected driver rows.
+
+        Continuous fields map to {"min", "max", "mean"}, integer fields to
+        their value at the end of each bucket; each is a list per driver.
+        """
+        start, stop, _ = slice(start, stop).indices(len(self))
+        stop = max(start, stop)
+        fields = list(DRIVER_FIELDS) if fields is None else fields
+
+        columns = {}
+        for field in fields:
+            decimals = DRIVER_FIELDS[field][1]
+            if field in self.stats:
+                columns[field] = {
+                    stat: _to_lists(values[rows, start:stop], decimals)
+                    for stat, values in self.stats[field].items()
+                }
+            else:
+                columns[field] = _to_lists(self.values[field][rows, start:stop], decimals)
+
+        return {
+            "resolution": self.hz,
+            "bucket_frames": self.bucket_frames,
+            "t": np.round(self.timeline[start:stop], 3).tolist(),
+            "lap": self.leader_lap[start:stop].tolist(),
+            "fields": columns,
+        }
+
+    def arrays(self):
+        """Arrays to persist, keyed by name (empty for a frame rate level)."""
+        if self.bucket_frames == 1:
+            return {}
+        arrays = {"timeline": self.timeline, "leader_lap": self.leader_lap}
+        for field, stats in self.stats.items():
+            arrays.update({f"{field}_{stat}": values for stat, values in stats.items()})
+        arrays.update(self.values)
+        return arrays
+
+    @classmethod
+    def from_arrays(cls, store, hz, bucket_frames, load):
+        """Rebuild a level saved with arrays(); load(name) returns each array."""
+        if bucket_frames == 1:
+            return cls.from_store(store, hz, 1)
+        return cls(
+            hz, bucket_frames,
+            timeline=load("timeline"),
+            leader_lap=load("leader_lap"),
+            stats={
+                field: {stat: load(f"{field}_{stat}") for stat in PYRAMID_STATS}
+                for field, (_, decimals) in DRIVER_FIELDS.items() if decimals is not None
+            },
+            values={
+                field: load(field)
+                for field, (_, decimals) in DRIVER_FIELDS.items() if decimals is None
+            },
+        )
+
+
+class TelemetryPyramid:
+    """
+    Decimated levels of a race, selected by resolution in Hz.
+
+    Args:
+        levels: PyramidLevel objects, finest first
+    """
+
+    def __init__(self, levels):
+        self.levels = {level.hz: level for level in levels}
+
+    @classmethod
+    def build(cls, store, frame_rate, levels_hz=PYRAMID_LEVELS_HZ):
+        """Aggregate a RaceFrameStore recorded at frame_rate Hz into each level."""
+        return cls([
+            PyramidLevel.from_store(store, hz, max(int(round(frame_rate / hz)), 1))
+            for hz in levels_hz
+        ])
+
+    def level(self, hz):
+        """
+        Return the level at hz.
+
+        Raises:
+            ValueError: No level at that resolution
+        """
+        for level_hz, level in self.levels.items():
+            if np.isclose(level_hz, hz):
+                return level
+        raise ValueError(
+            f"resolution must be one of {', '.join(f'{level_hz:g}' for level_hz in self.levels)}"
+        )
+
+
+def save_race_telemetry(directory, race_data):
+    """
+    Write race data (the dict returned by get_race_telemetry) to a directory.
+
+    Everything is written to a temporary sibling first and renamed into place,
+    so readers never see a half-written race.
+    """
+    telemetry = race_data["telemetry"]
+    directory = str(directory)
+    tmp_directory = f"{directory}.tmp-{os.getpid()}"
+    if os.path.exists(tmp_directory):
+        shutil.rmtree(tmp_directory)
+    os.makedirs(tmp_directory)
+
+    arrays = {"timeline": telemetry.timeline, "leader_lap": telemetry.leader_lap}
+    arrays.update({f"col_{field}": values for field, values in telemetry.columns.items()})
+    arrays.update({f"weather_{name}": values for name, values in telemetry.weather.items()})
+    pyramid = race_data.get("pyramid")
+    if pyramid is not None:
+        for level in pyramid.levels.values():
+            arrays.update({
+                f"pyramid_{level.hz:g}hz_{name}": values for name, values in level.arrays().items()
+            })
+    for name, values in arrays.items():
+        np.save(os.path.join(tmp_directory, f"{name}.npy"), np.ascontiguousarray(values))
+
+    header = {
+        "format_version": STORE_FORMAT_VERSION,
+        "num_frames": len(telemetry),
+        "driver_codes": telemetry.driver_codes,
+        "fields": list(telemetry.columns),
+        "weather_fields": list(telemetry.weather),
+        "driver_colors": {code: list(rgb) for code, rgb in race_data["driver_colors"].items()},
+        "track_statuses": race_data["track_statuses"],
+        "total_laps": int(race_data["total_laps"]),
+        "frame_rate": race_data.get("frame_rate"),
+        "pyramid_levels": [
+            {"hz": level.hz, "bucket_frames": level.bucket_frames}
+            for level in (pyramid.levels.values() if pyramid is not None else [])
+        ],
+    }
+    with open(os.path.join(tmp_directory, HEADER_FILE), "w") as f:
+        json.dump(header, f, default=float)
+
+    if os.path.exists(directory):
+        shutil.rmtree(directory)
+    os.replace(tmp_directory, directory)
+
+
+def load_race_telemetry(directory, mmap_mode="r"):
+    """
+    Open a race written by save_race_telemetry.
+
+    Returns the same dict shape as get_race_telemetry, with the store's arrays
+    memory-mapped (pass mmap_mode=None to read them fully into memory), or
+    None if the directory is missing or was written in an older format.
+    """
+    directory = str(directory)
+    try:
+        with open(os.path.join(directory, HEADER_FILE)) as f:
+            header = json.load(f)
+    except FileNotFoundError:
+        return None
+
+    if header.get("format_version") != STORE_FORMAT_VERSION:
+        return None
+
+    def _load(name):
+        return np.load(os.path.join(directory, f"{name}.npy"), mmap_mode=mmap_mode)
+
+    telemetry = RaceFrameStore(
+        timeline=_load("timeline"),
+        driver_codes=header["driver_codes"],
+        columns={field: _load(f"col_{field}") for field in header["fields"]},
+        leader_lap=_load("leader_lap"),
+        weather={name: _load(f"weather_{name}") for name in header["weather_fields"]},
+    )
+
+    if header.get("pyramid_levels"):
+        pyramid = TelemetryPyramid([
+            PyramidLevel.from_arrays(
+                telemetry, level["hz"], level["bucket_frames"],
+                lambda name, hz=level["hz"]: _load(f"pyramid_{hz:g}hz_{name}"),
+            )
+            for level in header["pyramid_levels"]
+        ])
+    else:
+        # Saved without a pyramid: build one from the frame timing
+        frame_rate = header.get("frame_rate")
+        if frame_rate is None and len(telemetry) > 1:
+            frame_rate = 1 / float(np.median(np.diff(telemetry.timeline[:1000])))
+        pyramid = TelemetryPyramid.build(telemetry, frame_rate or PYRAMID_LEVELS_HZ[0])
+
+    return {
+        "telemetry": telemetry,
+        "pyramid": pyramid,
+        "driver_colors": header["driver_colors"],
+        "track_statuses": header["track_statuses"],
+        "total_laps": header["total_laps"],
+    }
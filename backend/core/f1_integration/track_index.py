@@ -0,0 +1,93 @@
+"""Spatial index over a circuit's dense reference polyline.
+
+Build one TrackIndex per circuit and reuse it for every lookup. Nearest-point
+queries go through a KD-tree (O(log n) instead of scanning all reference
+points), and nearest_in_window offers a cheaper search around a known
+previous point for callers that follow a car through consecutive frames.
+"""
+import numpy as np
+from scipy.spatial import cKDTree
+
+
+class TrackIndex:
+    """
+    Nearest-point and projection queries against a reference polyline.
+
+    Args:
+        ref_xs, ref_ys: Coordinates of the dense reference polyline
+        cumulative_dists: Distance along the track at each reference point
+    """
+
+    def __init__(self, ref_xs, ref_ys, cumulative_dists):
+        self.xs = np.asarray(ref_xs, dtype=float)
+        self.ys = np.asarray(ref_ys, dtype=float)
+        self.cumulative_dists = np.asarray(cumulative_dists, dtype=float)
+        self._tree = cKDTree(np.column_stack([self.xs, self.ys]))
+
+        segment_lengths = np.hypot(np.diff(self.xs), np.diff(self.ys))
+        self.point_spacing = float(np.median(segment_lengths)) if len(segment_lengths) else 0.0
+
+    def __len__(self):
+        return len(self.xs)
+
+    @property
+    def length(self):
+        """Track length along the reference."""
+        return float(self.cumulative_dists[-1])
+
+    def nearest(self, xs, ys):
+        """Index of the nearest reference point for each (x, y)."""
+        points = np.column_stack([np.atleast_1d(xs), np.atleast_1d(ys)])
+        if len(self.xs) < 2:
+            return np.zeros(len(points), dtype=np.intp)
+
+        # Break ties towards the lower index, like an argmin scan would. This
+        # matters on a closed lap, where the first and last points coincide.
+        dists, idx = self._tree.query(points, k=2)
+        tied = dists[:, 1] == dists[:, 0]
+        return np.where(tied, idx.min(axis=1), idx[:, 0])
+
+    def nearest_in_window(self, x, y, hint, window=64):
+        """
+        Index of the nearest reference point, searching around hint first.
+
+        Only the reference points within `window` of hint (wrapping around
+        the lap) are checked. If the best of those lies on the edge of the
+        window, or further from the car than the window spans, the car has
+        moved out of range and the full KD-tree query is used instead.
+        """
+        num_ref = len(self.xs)
+        candidates = np.arange(hint - window, hint + window + 1) % num_ref
+        dists_sq = (self.xs[candidates] - x)**2 + (self.ys[candidates] - y)**2
+        best = int(np.argmin(dists_sq))
+
+        on_edge = best == 0 or best == len(candidates) - 1
+        too_far = dists_sq[best] > (window * self.point_spacing)**2
+        if on_edge or too_far:
+            return int(self.nearest(x, y)[0])
+        # A window wrapping the lap can hold both ends; prefer the lower index
+        return int(candidates[dists_sq == dists_sq[best]].min())
+
+    def project(self, xs, ys):
+        """Distance along the track of each (x, y), vectorized over all points."""
+        xs = np.asarray(xs, dtype=float)
+        ys = np.asarray(ys, dtype=float)
+        return self._project_onto_segments(xs, ys, self.nearest(xs, ys))
+
+    def _project_onto_segments(self, xs, ys, nearest_idx):
+        # Project onto the segment between the nearest and next point
+        num_ref = len(self.xs)
+        next_idx = np.minimum(nearest_idx + 1, num_ref - 1)
+        vx = self.xs[next_idx] - self.xs[nearest_idx]
+        vy = self.ys[next_idx] - self.ys[nearest_idx]
+        ux = xs - self.xs[nearest_idx]
+        uy = ys - self.ys[nearest_idx]
+        v_len_sq = vx * vx + vy * vy
+
+        # The last point and zero-length segments fall back to the nearest point
+        has_segment = (nearest_idx < num_ref - 1) & (v_len_sq > 0)
+        safe_len_sq = np.where(has_segment, v_len_sq, 1.0)
+        t = np.clip((ux * vx + uy * vy) / safe_len_sq, 0, 1)
+        segment_offset = np.where(has_segment, t * np.sqrt(v_len_sq), 0.0)
+
+        return self.cumulative_dists[nearest_idx] + segment_offset
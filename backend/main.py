@@ -6,7 +6,11 @@ FastAPI backend serving F1 telemetry data for the React frontend.
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from core.config import API_V1_PREFIX, PROJECT_NAME, VERSION, CORS_ORIGINS
-from api.routes import race, qualifying, events
+from api.routes import race, qualifying, events, jobs
+from services.f1_data_service import get_f1_service
+from services.executor import get_executor
+from services.jobs import get_job_manager
+from services.worker_pool import get_worker_pool
 
 # Create FastAPI app
 app = FastAPI(
@@ -30,6 +34,15 @@ app.add_middleware(
 app.include_router(race.router, prefix=API_V1_PREFIX)
 app.include_router(qualifying.router, prefix=API_V1_PREFIX)
 app.include_router(events.router, prefix=API_V1_PREFIX)
+app.include_router(jobs.router, prefix=API_V1_PREFIX)
+
+
+@app.on_event("shutdown")
+def shutdown_executor():
+    """Stop accepting blocking work when the server shuts down."""
+    get_executor().shutdown()
+    get_job_manager().shutdown()
+    get_worker_pool().shutdown()
 
 
 @app.get("/")
@@ -49,6 +62,12 @@ async def health_check():
     return {"status": "healthy"}
 
 
+@app.get("/cache/stats")
+async def cache_stats():
+    """Hit/miss statistics for the in-memory caches."""
+    return get_f1_service().get_cache_stats()
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(
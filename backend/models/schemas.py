@@ -99,6 +99,28 @@ class QualifyingTelemetryResponse(BaseModel):
     max_speed: float
 
 
+class JobRequest(BaseModel):
+    """Request to precompute a session artifact in the background."""
+    year: int
+    round_number: int
+    session_type: str
+    artifact: str
+
+
+class JobStatus(BaseModel):
+    """Status of a background precompute job."""
+    id: str
+    year: int
+    round_number: int
+    session_type: str
+    artifact: str
+    status: str
+    error: Optional[str] = None
+    created_at: str
+    started_at: Optional[str] = None
+    finished_at: Optional[str] = None
+
+
 class Event(BaseModel):
     """F1 event (race weekend) information."""
     round_number: int
@@ -0,0 +1,26 @@
+"""JSON encoding for API responses.
+
+Responses are encoded once, straight to bytes, with orjson. NumPy scalars and
+arrays are serialised natively, so route handlers can pass NumPy-backed data
+without converting it to Python objects first.
+"""
+import numpy as np
+import orjson
+
+JSON_MEDIA_TYPE = "application/json"
+
+_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+
+def _default(obj):
+    # Arrays orjson can't serialise natively (non-contiguous, unsupported dtype)
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    if isinstance(obj, np.generic):
+        return obj.item()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def encode_json(obj) -> bytes:
+    """Encode obj as JSON bytes."""
+    return orjson.dumps(obj, default=_default, option=_OPTIONS)
@@ -0,0 +1,147 @@
+"""Execution layer for running blocking F1 data work off the event loop.
+
+FastF1 session loads and telemetry computation are synchronous and can take
+minutes. Route handlers hand that work to a bounded thread pool and await it
+with a timeout, so the uvicorn event loop keeps serving cheap endpoints while
+a heavy session is computing.
+
+Cold work never holds a thread of that pool. When a call needs something
+that isn't cached yet, the service raises ColdWork (see defer_cold_work)
+instead of computing or waiting for it. The executor then runs the cold work
+once per key on its own bounded pool, every request that needs it awaits the
+same future without holding a thread, and the call is retried once it's done.
+A cached read therefore never queues behind requests waiting on a computation.
+"""
+import asyncio
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from core.config import BLOCKING_MAX_WORKERS, COLD_WORK_MAX_WORKERS, REQUEST_TIMEOUT_SECONDS
+
+_request_thread = threading.local()
+
+
+class ColdWork(Exception):
+    """
+    Raised on a request thread in place of blocking cold work.
+
+    Args:
+        key: Identifies the work, so concurrent requests share one run
+        fn: Does the work (blocking) so that a retry finds it cached
+    """
+
+    def __init__(self, key, fn):
+        super().__init__(f"Cold work needed: {key}")
+        self.key = key
+        self.fn = fn
+
+
+def defer_cold_work(key, fn):
+    """
+    Hand cold work to the executor when called from a request thread.
+
+    Call this before a computation or a load that can block for long. On a
+    request thread it raises ColdWork; anywhere else (the cold work pool,
+    background jobs) it returns and the caller does the work itself. When
+    the call is retried after the cold work failed, the failure is raised
+    here instead, so the caller handles it as if it had done the work.
+    """
+    if getattr(_request_thread, "active", False):
+        error = _request_thread.failed.get(key)
+        if error is not None:
+            raise error
+        raise ColdWork(key, fn)
+
+
+def _as_request(failed, fn, *args, **kwargs):
+    _request_thread.active = True
+    _request_thread.failed = failed
+    try:
+        return fn(*args, **kwargs)
+    finally:
+        _request_thread.active = False
+        _request_thread.failed = {}
+
+
+class BlockingExecutor:
+    """
+    Bounded thread pools with per-job timeouts.
+
+    Args:
+        max_workers: Maximum number of blocking calls running at once
+        timeout: Default seconds to wait for a call before giving up
+        cold_max_workers: Maximum number of cold computations and session
+            loads running at once
+    """
+
+    def __init__(self, max_workers: int, timeout: float, cold_max_workers: int):
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="f1-blocking")
+        self._cold_pool = ThreadPoolExecutor(max_workers=cold_max_workers, thread_name_prefix="f1-cold")
+        # key -> future of the cold work in progress; only used on the event loop
+        self._cold_work = {}
+
+    async def run(self, fn, *args, timeout=None, **kwargs):
+        """
+        Run fn(*args, **kwargs) in the pool and await its result.
+
+        Raises asyncio.TimeoutError if it takes longer than timeout seconds.
+        The worker thread can't be interrupted, so a timed-out call still runs
+        to completion in the background (and still fills the caches).
+        """
+        return await asyncio.wait_for(self._run(fn, args, kwargs), timeout or self.timeout)
+
+    async def _run(self, fn, args, kwargs):
+        loop = asyncio.get_running_loop()
+        failed = {}  # key -> exception of cold work that failed
+        call = functools.partial(_as_request, failed, fn, *args, **kwargs)
+        done = set()
+        while True:
+            try:
+                return await loop.run_in_executor(self._pool, call)
+            except ColdWork as cold:
+                if cold.key in done:
+                    # Done but not kept (e.g. larger than the cache budget):
+                    # run the whole call where blocking is allowed
+                    return await loop.run_in_executor(self._cold_pool, functools.partial(fn, *args, **kwargs))
+                try:
+                    await self._cold(cold.key, cold.fn)
+                except Exception as e:
+                    failed[cold.key] = e
+                done.add(cold.key)
+
+    async def _cold(self, key, fn):
+        future = self._cold_work.get(key)
+        if future is None:
+            future = asyncio.get_running_loop().run_in_executor(self._cold_pool, fn)
+            self._cold_work[key] = future
+            future.add_done_callback(functools.partial(self._cold_done, key))
+        # A waiter timing out must not cancel the work for everyone else
+        await asyncio.shield(future)
+
+    def _cold_done(self, key, future):
+        if self._cold_work.get(key) is future:
+            del self._cold_work[key]
+        if not future.cancelled():
+            future.exception()  # Retrieved here in case every waiter timed out
+
+    def shutdown(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
+        self._cold_pool.shutdown(wait=False, cancel_futures=True)
+
+
+# Singleton instance
+_executor = None
+
+def get_executor() -> BlockingExecutor:
+    """Get singleton blocking executor instance."""
+    global _executor
+    if _executor is None:
+        _executor = BlockingExecutor(
+            max_workers=BLOCKING_MAX_WORKERS,
+            timeout=REQUEST_TIMEOUT_SECONDS,
+            cold_max_workers=COLD_WORK_MAX_WORKERS,
+        )
+    return _executor
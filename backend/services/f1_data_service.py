@@ -8,15 +8,52 @@ sys.path.insert(0, str(Path(__file__).parent.parent / "core" / "f1_integration")
 from f1_data import (
     get_race_telemetry,
     get_quali_telemetry,
+    get_quali_lap_telemetry,
+    load_precomputed_race_telemetry,
+    load_precomputed_quali_telemetry,
+    load_precomputed_quali_lap,
+    race_telemetry_path,
+    quali_telemetry_path,
+    quali_laps_path,
+    QUALI_SEGMENTS,
     enable_cache,
     get_circuit_rotation,
+    get_event_session,
     load_session,
     list_rounds,
     list_sprints
 )
+from frame_codec import (
+    FRAMES_MEDIA_TYPE,
+    DELTA_MEDIA_TYPE,
+    DEFAULT_KEYFRAME_INTERVAL,
+    encode_frame_page,
+    encode_delta_page,
+)
 from ui_components import build_track_from_example_lap
+from core.config import (
+    SESSION_CACHE_MAX_ENTRIES,
+    SESSION_CACHE_MAX_BYTES,
+    RESULT_CACHE_MAX_BYTES,
+    COMPUTE_MAX_CONCURRENCY,
+    RACE_PAGE_FRAMES,
+)
+from services.session_cache import SessionCache
+from services.result_cache import ResultCache
+from services.single_flight import SingleFlight
+from services.encoding import encode_json
+from services.worker_pool import get_worker_pool
+from services.executor import defer_cold_work
+from services import page_cache
+import os
+import shutil
+import threading
+from concurrent.futures import ThreadPoolExecutor
 import numpy as np
 
+# Per-frame telemetry fields of a qualifying lap, in frame order
+QUALI_TELEMETRY_FIELDS = ("x", "y", "dist", "rel_dist", "speed", "gear", "throttle", "brake", "drs")
+
 
 class F1DataService:
     """Service for F1 data operations."""
@@ -24,10 +61,30 @@ class F1DataService:
     def __init__(self):
         """Initialize the service and enable FastF1 cache."""
         enable_cache()
+        self.session_cache = SessionCache(
+            max_entries=SESSION_CACHE_MAX_ENTRIES,
+            max_bytes=SESSION_CACHE_MAX_BYTES,
+        )
+        self.result_cache = ResultCache(max_bytes=RESULT_CACHE_MAX_BYTES)
+        # Coalesces concurrent cold computations, in this process and across workers
+        self.single_flight = SingleFlight(lock_dir="computed_data/.locks")
+        # Limits how many sessions are computed from scratch at once
+        self._compute_slots = threading.BoundedSemaphore(COMPUTE_MAX_CONCURRENCY)
+        # Per-driver extraction runs on one long-lived process pool
+        self.worker_pool = get_worker_pool()
+        # Schedule lookups only name the computed data files, so one per session is enough
+        self._events = {}
+        # Race pages are compressed off the request path, one race at a time;
+        # race_dir -> (cancel event, future) of the race's queued page write,
+        # and race_dir -> generation, bumped whenever the race's data is replaced
+        self._page_writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="race-pages")
+        self._page_jobs = {}
+        self._page_generations = {}
+        self._pages_lock = threading.Lock()
 
     def get_session(self, year: int, round_number: int, session_type: str = 'R'):
         """
-        Load F1 session data.
+        Load F1 session data, reusing a cached session when available.
 
         Args:
             year: Season year
@@ -37,28 +94,405 @@ class F1DataService:
         Returns:
             FastF1 session object
         """
-        return load_session(year, round_number, session_type)
+        key = (year, round_number, session_type)
+        return self.session_cache.get_or_load(
+            key, lambda: load_session(year, round_number, session_type)
+        )
+
+    def _shared_session(self, year: int, round_number: int, session_type: str):
+        """get_session, with concurrent cold loads of the same session shared."""
+        if (year, round_number, session_type) not in self.session_cache:
+            defer_cold_work(
+                ("session", year, round_number, session_type),
+                lambda: self._shared_session(year, round_number, session_type),
+            )
+        return self.single_flight.do(
+            ("session", year, round_number, session_type),
+            lambda: self.get_session(year, round_number, session_type),
+        )
+
+    def _event(self, year: int, round_number: int, session_type: str):
+        """get_event_session, looked up once per session."""
+        key = (year, round_number, session_type)
+        event = self._events.get(key)
+        if event is None:
+            event = self._events[key] = get_event_session(year, round_number, session_type)
+        return event
+
+    def _race_dir(self, year: int, round_number: int, session_type: str):
+        return race_telemetry_path(self._event(year, round_number, session_type), session_type)
+
+    def get_cache_stats(self):
+        """Return hit/miss statistics for the service caches."""
+        return {
+            "sessions": self.session_cache.stats(),
+            "results": self.result_cache.stats(),
+            "coalesced_computations": self.single_flight.coalesced,
+            "worker_pool": self.worker_pool.stats(),
+        }
+
+    def invalidate(self, year: int, round_number: int, session_type: str,
+                   remove_computed: bool = True):
+        """
+        Drop everything cached for a session so the next request recomputes it.
+
+        Args:
+            remove_computed: Also delete the computed data files on disk
+        """
+        self.session_cache.invalidate((year, round_number, session_type))
+        self.result_cache.invalidate(
+            match=lambda key: key[1:4] == (year, round_number, session_type)
+        )
+
+        if remove_computed:
+            event = self._event(year, round_number, session_type)
+            race_dir = race_telemetry_path(event, session_type)
+            self._cancel_race_pages(race_dir)
+            quali_file = quali_telemetry_path(event, session_type)
+            quali_laps_dir = quali_laps_path(event, session_type)
+            if os.path.isdir(race_dir):
+                shutil.rmtree(race_dir)
+            if os.path.isfile(quali_file):
+                os.remove(quali_file)
+            if os.path.isdir(quali_laps_dir):
+                shutil.rmtree(quali_laps_dir)
+
+    def _cached_result(self, key, load_from_disk, compute):
+        """
+        Look up a computed result in the result cache, computing it at most once.
+
+        Concurrent misses for the same key share one computation. The leader
+        holds a per-key file lock and re-checks the disk once it has it, so a
+        computation finished by another worker is loaded rather than repeated.
+        On a request thread a miss is handed to the executor's cold work pool.
+        """
+        def compute_once():
+            defer_cold_work(key, lambda: self._cached_result(key, load_from_disk, compute))
+
+            def locked_compute():
+                value = load_from_disk()
+                if value is not None:
+                    return value
+                with self._compute_slots:
+                    return compute()
+            return self.single_flight.do(key, locked_compute)
+
+        return self.result_cache.get(key, load_from_disk=load_from_disk, compute=compute_once)
+
+    def _race_telemetry(self, year: int, round_number: int, session_type: str):
+        """Computed race telemetry from the memory tier, the disk, or a fresh computation."""
+        return self._cached_result(
+            ("race", year, round_number, session_type),
+            load_from_disk=lambda: load_precomputed_race_telemetry(
+                self._event(year, round_number, session_type), session_type
+            ),
+            compute=lambda: self._compute_race_telemetry(year, round_number, session_type),
+        )
+
+    def _compute_race_telemetry(self, year: int, round_number: int, session_type: str):
+        # Pages still being written from older data must not land in the new race directory
+        race_dir = self._race_dir(year, round_number, session_type)
+        self._cancel_race_pages(race_dir)
+        generation = self._page_generation(race_dir)
+        race_telemetry = get_race_telemetry(
+            self._shared_session(year, round_number, session_type), session_type=session_type,
+            pool=self.worker_pool,
+        )
+        self._queue_race_pages(race_dir, generation, race_telemetry)
+        return race_telemetry
+
+    def _page_generation(self, race_dir: str):
+        with self._pages_lock:
+            return self._page_generations.get(race_dir, 0)
+
+    def _queue_race_pages(self, race_dir: str, generation: int, race_telemetry):
+        """
+        Pre-encode and compress every page of race telemetry on the page writer thread.
+
+        generation is _page_generation(race_dir) from before race_telemetry was
+        read; if the race has been invalidated since, the data is stale and
+        nothing is queued.
+        """
+        with self._pages_lock:
+            if race_dir in self._page_jobs or self._page_generations.get(race_dir, 0) != generation:
+                return
+            cancel = threading.Event()
+            future = self._page_writer.submit(self._write_race_pages, race_dir, race_telemetry, cancel)
+            self._page_jobs[race_dir] = (cancel, future)
+
+    def _write_race_pages(self, race_dir: str, race_telemetry, cancel: threading.Event):
+        total_frames = len(race_telemetry['telemetry'])
+        bodies = (
+            encode_json(self._race_page(race_telemetry, start_frame, RACE_PAGE_FRAMES))
+            for start_frame in range(0, total_frames, RACE_PAGE_FRAMES)
+        )
+        try:
+            page_cache.write_pages(race_dir, RACE_PAGE_FRAMES, bodies, cancel)
+        except Exception as e:
+            print(f"Failed to write race pages to {race_dir}: {e}")
+        finally:
+            with self._pages_lock:
+                # A cancelled job may already have been replaced by a newer one
+                if self._page_jobs.get(race_dir, (None,))[0] is cancel:
+                    del self._page_jobs[race_dir]
+
+    def _cancel_race_pages(self, race_dir: str):
+        """Stop a race's queued or running page write and wait until it has."""
+        with self._pages_lock:
+            self._page_generations[race_dir] = self._page_generations.get(race_dir, 0) + 1
+            job = self._page_jobs.pop(race_dir, None)
+        if job is None:
+            return
+        cancel, future = job
+        cancel.set()
+        if not future.cancel():
+            # Returns after at most the page being compressed
+            future.result()
+
+    def _quali_telemetry(self, year: int, round_number: int, session_type: str):
+        """Computed qualifying telemetry from the memory tier, the disk, or a fresh computation."""
+        return self._cached_result(
+            ("quali", year, round_number, session_type),
+            load_from_disk=lambda: load_precomputed_quali_telemetry(
+                self._event(year, round_number, session_type), session_type
+            ),
+            compute=lambda: get_quali_telemetry(
+                self._shared_session(year, round_number, session_type), session_type=session_type,
+                pool=self.worker_pool,
+            ),
+        )
+
+    def _quali_lap_telemetry(self, year: int, round_number: int, session_type: str,
+                             driver_code: str, segment: str):
+        """
+        One driver's qualifying lap from memory, the per-lap cache on disk, or
+        computing just that lap.
+
+        Single laps don't wait for a compute slot, so a lap can be served while
+        whole sessions are computing; concurrent loads of the session are shared.
+        """
+        event = self._event(year, round_number, session_type)
+
+        def load_from_disk():
+            lap = load_precomputed_quali_lap(event, session_type, driver_code, segment)
+            if lap is None and os.path.isfile(quali_telemetry_path(event, session_type)):
+                # Sessions computed before laps were cached one by one
+                full = self._quali_telemetry(year, round_number, session_type)
+                lap = full.get('telemetry', {}).get(driver_code, {}).get(segment)
+            return lap
+
+        def compute():
+            session = self._shared_session(year, round_number, session_type)
+            return get_quali_lap_telemetry(session, driver_code, segment, session_type=session_type)
+
+        def compute_once():
+            defer_cold_work(key, lambda: self._quali_lap_telemetry(
+                year, round_number, session_type, driver_code, segment
+            ))
+            return self.single_flight.do(key, lambda: load_from_disk() or compute())
+
+        key = ("quali_lap", year, round_number, session_type, driver_code, segment)
+        return self.result_cache.get(key, load_from_disk=load_from_disk, compute=compute_once)
 
     def get_race_data(self, year: int, round_number: int, session_type: str = 'R'):
         """
         Get race telemetry data.
 
         Returns dict with:
-            - frames: List of frame dictionaries
+            - telemetry: RaceFrameStore holding the columnar frame data
             - track_statuses: List of track status events
             - driver_colors: Dict mapping driver codes to RGB colors
             - total_laps: Total number of laps
+            - pyramid: TelemetryPyramid of decimated overview levels
         """
-        session = self.get_session(year, round_number, session_type)
-        race_telemetry = get_race_telemetry(session, session_type=session_type)
+        race_telemetry = self._race_telemetry(year, round_number, session_type)
 
         return {
-            "frames": race_telemetry['frames'],
+            "telemetry": race_telemetry['telemetry'],
+            "pyramid": race_telemetry['pyramid'],
             "track_statuses": race_telemetry['track_statuses'],
             "driver_colors": race_telemetry['driver_colors'],
             "total_laps": race_telemetry['total_laps']
         }
 
+    def get_race_page(self, year: int, round_number: int, session_type: str = 'R',
+                      start_frame: int = 0, frame_count: int = 1000,
+                      refresh: bool = False, encoding: str = 'json',
+                      t_start: float = None, t_end: float = None,
+                      lap_start: int = None, lap_end: int = None,
+                      drivers: list = None, fields: list = None,
+                      keyframe_interval: int = DEFAULT_KEYFRAME_INTERVAL):
+        """
+        Get one page of race telemetry frames plus the race metadata.
+
+        Args:
+            start_frame: Index of the first frame in the page
+            frame_count: Maximum number of frames in the page
+            refresh: Drop cached data and recompute the race first
+            encoding: 'json' for a dict of frames, or 'frames' / 'delta' for
+                the frame_codec binary / delta encodings as bytes
+            t_start, t_end: Limit the frames to this time range in seconds
+            lap_start, lap_end: Limit the frames to these leader laps
+                (inclusive), instead of a time range
+            drivers: Driver codes to include (default: all)
+            fields: Driver fields to include (default: all)
+            keyframe_interval: Frames between keyframes of the delta encoding
+
+        With a range, the page starts at the later of start_frame and the
+        range start, and has_more refers to the end of the range.
+
+        Returns dict with frames, track_statuses, driver_colors, total_laps,
+        total_frames, start_frame, end_frame and has_more. With a binary
+        encoding the same metadata goes in the encoded header and the frames
+        as packed arrays, returned as bytes.
+        """
+        if refresh:
+            self.invalidate(year, round_number, session_type)
+        data = self.get_race_data(year, round_number, session_type)
+
+        range_start, range_stop = data['telemetry'].frame_range(t_start, t_end, lap_start, lap_end)
+        return self._race_page(
+            data, max(start_frame, range_start), frame_count,
+            encoding=encoding, range_stop=range_stop, drivers=drivers, fields=fields,
+            keyframe_interval=keyframe_interval,
+        )
+
+    def get_race_page_file(self, year: int, round_number: int, session_type: str = 'R',
+                           start_frame: int = 0, frame_count: int = 1000,
+                           accept_encoding: str = None):
+        """
+        Get the pre-compressed file for a whole page of race telemetry.
+
+        Only pages aligned to RACE_PAGE_FRAMES are stored. A page that isn't
+        written yet (still being written, or a race computed before pages
+        were) returns None and queues the race's pages to be written.
+
+        Returns:
+            (path, content encoding), or None if the request isn't a stored
+            page or the client accepts none of the stored encodings
+        """
+        if frame_count != RACE_PAGE_FRAMES or start_frame < 0 or start_frame % RACE_PAGE_FRAMES:
+            return None
+        encodings = page_cache.accepted_encodings(accept_encoding)
+        if not encodings:
+            return None
+
+        race_dir = self._race_dir(year, round_number, session_type)
+        generation = self._page_generation(race_dir)
+        data = self.get_race_data(year, round_number, session_type)
+        if start_frame >= len(data['telemetry']):
+            return None
+
+        page_file = page_cache.find_page(race_dir, RACE_PAGE_FRAMES, start_frame // RACE_PAGE_FRAMES, encodings)
+        if page_file is None:
+            self._queue_race_pages(race_dir, generation, data)
+        return page_file
+
+    def _race_page(self, data, start_frame: int, frame_count: int, encoding: str = 'json',
+                   range_stop: int = None, drivers: list = None, fields: list = None,
+                   keyframe_interval: int = DEFAULT_KEYFRAME_INTERVAL):
+        """Build one page from race data (see get_race_page)."""
+        # Only the requested slice is built as frame dicts
+        telemetry = data['telemetry']
+        total_frames = len(telemetry)
+        if range_stop is None:
+            range_stop = total_frames
+
+        # Get requested slice
+        end_frame = max(min(start_frame + frame_count, range_stop), start_frame)
+        metadata = {
+            "track_statuses": data.get('track_statuses', []),
+            "driver_colors": data.get('driver_colors', {}),
+            "total_laps": data.get('total_laps', 0),
+            "total_frames": total_frames,
+            "start_frame": start_frame,
+            "end_frame": end_frame,
+            "has_more": end_frame < range_stop
+        }
+
+        if encoding == 'frames':
+            return encode_frame_page(telemetry, start_frame, end_frame, metadata, drivers, fields)
+        if encoding == 'delta':
+            return encode_delta_page(
+                telemetry, start_frame, end_frame, metadata, drivers, fields, keyframe_interval
+            )
+
+        return {"frames": telemetry.frames(start_frame, end_frame, drivers, fields), **metadata}
+
+    def get_race_overview(self, year: int, round_number: int, session_type: str = 'R',
+                          resolution: float = 1, t_start: float = None, t_end: float = None,
+                          drivers: list = None, fields: list = None):
+        """
+        Get a decimated, columnar view of the race from the telemetry pyramid.
+
+        Args:
+            resolution: Pyramid level in Hz (see PYRAMID_LEVELS_HZ)
+            t_start, t_end: Limit the buckets to this time range in seconds
+            drivers: Driver codes to include (default: all)
+            fields: Driver fields to include (default: all)
+
+        Returns dict with resolution, bucket_frames, t, lap, driver_codes,
+        fields (per field a list per driver, or min/max/mean of those for
+        continuous fields), total_laps and driver_colors.
+
+        Raises:
+            ValueError: Unknown resolution, driver or field
+        """
+        data = self.get_race_data(year, round_number, session_type)
+        telemetry = data['telemetry']
+        rows, fields = telemetry.select(drivers, fields)
+        level = data['pyramid'].level(resolution)
+
+        start, stop = level.bucket_range_for_times(t_start, t_end)
+        overview = level.overview(start, stop, rows, fields)
+        overview.update({
+            "driver_codes": telemetry.driver_codes if drivers is None else list(drivers),
+            "total_laps": data.get('total_laps', 0),
+            "driver_colors": data.get('driver_colors', {}),
+        })
+        return overview
+
+    def get_race_stream(self, year: int, round_number: int, session_type: str = 'R',
+                        start_frame: int = None, end_frame: int = None,
+                        t_start: float = None, t_end: float = None,
+                        lap_start: int = None, lap_end: int = None,
+                        drivers: list = None, fields: list = None):
+        """
+        Resolve a frame range of race telemetry for streaming.
+
+        Bounds are one of frame indices [start_frame, end_frame), times in
+        seconds [t_start, t_end] or leader laps [lap_start, lap_end]; unset
+        bounds are open. drivers and fields limit the driver dicts in each
+        frame.
+
+        Returns dict with:
+            - lines: Generator of NDJSON-encoded frames (bytes), built in chunks
+            - start_frame, end_frame, total_frames: The resolved range
+        """
+        by_frame = start_frame is not None or end_frame is not None
+        by_range = any(bound is not None for bound in (t_start, t_end, lap_start, lap_end))
+        if by_frame and by_range:
+            raise ValueError("Use either frame bounds or time/lap bounds, not both")
+
+        telemetry = self.get_race_data(year, round_number, session_type)['telemetry']
+        total_frames = len(telemetry)
+
+        # Validate the projection before the response starts streaming
+        telemetry.select(drivers, fields)
+
+        if by_range:
+            start, stop = telemetry.frame_range(t_start, t_end, lap_start, lap_end)
+        else:
+            start, stop, _ = slice(start_frame, end_frame).indices(total_frames)
+            stop = max(start, stop)
+
+        return {
+            "lines": _ndjson_lines(telemetry, start, stop, drivers, fields),
+            "start_frame": start,
+            "end_frame": stop,
+            "total_frames": total_frames,
+        }
+
     def get_track_geometry(self, year: int, round_number: int, session_type: str = 'R'):
         """
         Get track geometry data.
@@ -69,7 +503,7 @@ class F1DataService:
             - rotation: Circuit rotation in degrees
             - bounds: Dict with x_min, x_max, y_min, y_max
         """
-        session = self.get_session(year, round_number, session_type)
+        session = self._shared_session(year, round_number, session_type)
         example_lap = session.laps.pick_fastest().get_telemetry()
         circuit_rotation = get_circuit_rotation(session)
 
@@ -93,20 +527,42 @@ class F1DataService:
             }
         }
 
-    def get_qualifying_results(self, year: int, round_number: int, session_type: str = 'Q'):
+    def get_qualifying_results(self, year: int, round_number: int, session_type: str = 'Q',
+                               drivers: list = None, fields: list = None):
         """
         Get qualifying session results.
 
+        Args:
+            drivers: Driver codes whose telemetry to include (default: all)
+            fields: Telemetry fields to include in each frame (default: all)
+
         Returns dict with results and telemetry data.
         """
-        session = self.get_session(year, round_number, session_type)
-        qualifying_data = get_quali_telemetry(session, session_type=session_type)
+        qualifying_data = self._quali_telemetry(year, round_number, session_type)
+        if drivers is None and fields is None:
+            return qualifying_data
+
+        telemetry_data = qualifying_data.get('telemetry', {})
+        if drivers is not None:
+            unknown = [code for code in drivers if code not in telemetry_data]
+            if unknown:
+                raise ValueError(f"Unknown driver(s): {', '.join(unknown)}")
+            telemetry_data = {code: telemetry_data[code] for code in drivers}
+
+        if fields is not None:
+            telemetry_data = {
+                code: {
+                    segment: _project_quali_segment(segment_data, fields)
+                    for segment, segment_data in segments.items()
+                }
+                for code, segments in telemetry_data.items()
+            }
 
-        return qualifying_data
+        return {**qualifying_data, "telemetry": telemetry_data}
 
     def get_driver_qualifying_telemetry(self, year: int, round_number: int,
                                        driver_code: str, segment: str,
-                                       session_type: str = 'Q'):
+                                       session_type: str = 'Q', fields: list = None):
         """
         Get telemetry for a specific driver's qualifying lap.
 
@@ -116,21 +572,31 @@ class F1DataService:
             driver_code: Driver code (e.g., 'VER', 'HAM')
             segment: Qualifying segment ('Q1', 'Q2', 'Q3')
             session_type: Session type ('Q' or 'SQ')
+            fields: Telemetry fields to include in each frame (default: all)
 
         Returns:
-            Dict with frames, drs_zones, and speed range
+            Dict with frames, drs_zones, and speed range, or None for an
+            unknown driver or segment
+
+        Only the requested lap is computed on a cold cache; see
+        _quali_lap_telemetry.
         """
-        session = self.get_session(year, round_number, session_type)
-        qualifying_data = get_quali_telemetry(session, session_type=session_type)
+        # Codes are also file names in the per-lap cache
+        if segment not in QUALI_SEGMENTS or not driver_code.isalnum():
+            return None
 
-        # Extract telemetry for specific driver and segment
-        telemetry_data = qualifying_data.get('telemetry', {})
-        driver_data = telemetry_data.get(driver_code, {})
-        segment_data = driver_data.get(segment, {})
+        try:
+            segment_data = self._quali_lap_telemetry(
+                year, round_number, session_type, driver_code, segment
+            )
+        except ValueError:
+            return None
 
         if not segment_data:
             return None
 
+        if fields is not None:
+            return _project_quali_segment(segment_data, fields)
         return segment_data
 
     def list_events(self, year: int):
@@ -142,6 +608,30 @@ class F1DataService:
         return list_sprints(year)
 
 
+def _project_quali_segment(segment_data, fields: list):
+    """Copy of a qualifying segment with each frame's telemetry limited to fields."""
+    unknown = [field for field in fields if field not in QUALI_TELEMETRY_FIELDS]
+    if unknown:
+        raise ValueError(
+            f"Unknown field(s): {', '.join(unknown)}; available: {', '.join(QUALI_TELEMETRY_FIELDS)}"
+        )
+    fields = [field for field in QUALI_TELEMETRY_FIELDS if field in fields]
+
+    frames = [
+        {**frame, "telemetry": {field: frame["telemetry"][field] for field in fields}}
+        for frame in segment_data.get('frames', [])
+    ]
+    return {**segment_data, "frames": frames}
+
+
+def _ndjson_lines(telemetry, start: int, stop: int, drivers: list = None, fields: list = None,
+                  chunk_size: int = 250):
+    """Yield frames start..stop as newline-delimited JSON, one chunk per yield."""
+    for chunk_start in range(start, stop, chunk_size):
+        frames = telemetry.frames(chunk_start, min(chunk_start + chunk_size, stop), drivers, fields)
+        yield b"".join(encode_json(frame) + b"\n" for frame in frames)
+
+
 # Singleton instance
 _f1_service = None
 
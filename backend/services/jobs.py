@@ -0,0 +1,194 @@
+"""Background precompute jobs for race and qualifying sessions.
+
+A job runs the same service calls as the data endpoints (and so the same
+get_race_telemetry / get_quali_telemetry pipeline), filling the result cache
+and the computed data on disk. Once a job is done the normal endpoints answer
+from cache, so clients never hold a request open for a cold computation.
+
+Job status is kept in memory and mirrored to a small JSON file per job, so a
+status poll that lands on another uvicorn worker can still answer.
+"""
+import json
+import os
+import threading
+import traceback
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+from core.config import JOBS_MAX_WORKERS
+from services.f1_data_service import get_f1_service
+
+# Artifact name -> session types it can be computed for
+JOB_ARTIFACTS = {
+    "race_telemetry": ("R", "S"),
+    "quali_telemetry": ("Q", "SQ"),
+}
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_DONE = "done"
+JOB_FAILED = "failed"
+
+
+def _now():
+    return datetime.now(timezone.utc).isoformat()
+
+
+class Job:
+    """A single precompute job and its status."""
+
+    def __init__(self, year: int, round_number: int, session_type: str, artifact: str):
+        self.id = uuid.uuid4().hex
+        self.year = year
+        self.round_number = round_number
+        self.session_type = session_type
+        self.artifact = artifact
+        self.status = JOB_QUEUED
+        self.error = None
+        self.created_at = _now()
+        self.started_at = None
+        self.finished_at = None
+
+    @property
+    def key(self):
+        return (self.artifact, self.year, self.round_number, self.session_type)
+
+    @property
+    def active(self):
+        return self.status in (JOB_QUEUED, JOB_RUNNING)
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "year": self.year,
+            "round_number": self.round_number,
+            "session_type": self.session_type,
+            "artifact": self.artifact,
+            "status": self.status,
+            "error": self.error,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+
+
+class JobManager:
+    """
+    Queue and run precompute jobs.
+
+    Args:
+        service: F1DataService whose caches the jobs fill
+        max_workers: Number of jobs run at the same time
+        status_dir: Directory for the per-job status files
+        max_finished: Finished jobs kept in memory before the oldest are dropped
+    """
+
+    def __init__(self, service, max_workers: int, status_dir: str, max_finished: int = 200):
+        self.service = service
+        self.status_dir = status_dir
+        self.max_finished = max_finished
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="f1-job")
+        self._jobs = {}
+        self._active_by_key = {}
+        self._lock = threading.Lock()
+
+    def submit(self, year: int, round_number: int, session_type: str, artifact: str) -> Job:
+        """
+        Enqueue a job, or return the queued/running job for the same work.
+
+        Raises:
+            ValueError: Unknown artifact or one that doesn't apply to the session type
+        """
+        if artifact not in JOB_ARTIFACTS:
+            raise ValueError(f"artifact must be one of {', '.join(JOB_ARTIFACTS)}")
+        if session_type not in JOB_ARTIFACTS[artifact]:
+            raise ValueError(
+                f"{artifact} is only available for session types {', '.join(JOB_ARTIFACTS[artifact])}"
+            )
+
+        with self._lock:
+            job = Job(year, round_number, session_type, artifact)
+            existing = self._active_by_key.get(job.key)
+            if existing is not None:
+                return existing
+            self._jobs[job.id] = job
+            self._active_by_key[job.key] = job
+            self._prune()
+
+        self._save(job)
+        self._pool.submit(self._run, job)
+        return job
+
+    def get(self, job_id: str):
+        """Return the job's status dict, or None if the job is unknown."""
+        # Job ids are hex uuids; anything else can't name a status file
+        if not job_id or any(c not in "0123456789abcdef" for c in job_id):
+            return None
+
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None:
+                return job.to_dict()
+
+        # The job may have been submitted to another worker process
+        try:
+            with open(self._status_path(job_id)) as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def shutdown(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+    def _run(self, job: Job):
+        job.status = JOB_RUNNING
+        job.started_at = _now()
+        self._save(job)
+
+        try:
+            if job.artifact == "race_telemetry":
+                self.service.get_race_data(job.year, job.round_number, job.session_type)
+            else:
+                self.service.get_qualifying_results(job.year, job.round_number, job.session_type)
+            job.status = JOB_DONE
+        except Exception as e:
+            traceback.print_exc()
+            job.status = JOB_FAILED
+            job.error = str(e)
+        finally:
+            job.finished_at = _now()
+            with self._lock:
+                self._active_by_key.pop(job.key, None)
+            self._save(job)
+
+    def _prune(self):
+        finished = [job_id for job_id, job in self._jobs.items() if not job.active]
+        for job_id in finished[:max(0, len(finished) - self.max_finished)]:
+            del self._jobs[job_id]
+
+    def _status_path(self, job_id: str):
+        return os.path.join(self.status_dir, f"{job_id}.json")
+
+    def _save(self, job: Job):
+        os.makedirs(self.status_dir, exist_ok=True)
+        path = self._status_path(job.id)
+        tmp_path = f"{path}.tmp-{os.getpid()}"
+        with open(tmp_path, "w") as f:
+            json.dump(job.to_dict(), f)
+        os.replace(tmp_path, path)
+
+
+# Singleton instance
+_job_manager = None
+
+def get_job_manager() -> JobManager:
+    """Get singleton job manager instance."""
+    global _job_manager
+    if _job_manager is None:
+        _job_manager = JobManager(
+            service=get_f1_service(),
+            max_workers=JOBS_MAX_WORKERS,
+            status_dir="computed_data/.jobs",
+        )
+    return _job_manager
@@ -0,0 +1,123 @@
+"""Server-side playback clock for the live race WebSocket.
+
+The clock maps wall time to race time at the chosen speed and tracks which
+frames have already been pushed, so each tick sends exactly the frames the
+playback has moved past. Seeking, pausing and speed changes re-anchor the
+clock at the current race time.
+"""
+import time
+
+import numpy as np
+
+MIN_SPEED = 0.5
+MAX_SPEED = 16.0
+
+# How often the live socket pushes the frames that have become due
+TICK_SECONDS = 0.1
+
+
+class PlaybackClock:
+    """
+    Playback position over a race timeline.
+
+    Args:
+        timeline: (n_frames,) seconds of each frame, ascending
+        speed: Initial playback speed multiplier
+        clock: Monotonic time source, overridable for tests
+    """
+
+    def __init__(self, timeline, speed: float = 1.0, clock=time.monotonic):
+        self.timeline = timeline
+        self.clock = clock
+        self.paused = True
+        self.speed = 1.0
+        self.set_speed(speed)
+
+        # Race time at the anchor, and the wall time it was taken
+        self._anchor_t = float(timeline[0]) if len(timeline) else 0.0
+        self._anchor_wall = clock()
+        # Next frame to send, and the frame the playback is showing
+        self.next_frame = 0
+        self.position = 0
+
+    @property
+    def total_frames(self):
+        return len(self.timeline)
+
+    @property
+    def finished(self):
+        return self.next_frame >= self.total_frames
+
+    def race_time(self):
+        """Current race time in seconds."""
+        if self.paused:
+            return self._anchor_t
+        return self._anchor_t + (self.clock() - self._anchor_wall) * self.speed
+
+    def play(self):
+        if self.paused and not self.finished:
+            self._anchor_wall = self.clock()
+            self.paused = False
+
+    def pause(self):
+        if not self.paused:
+            self._anchor_t = self.race_time()
+            self.paused = True
+
+    def set_speed(self, speed: float):
+        """Change the speed multiplier, keeping the current race time."""
+        speed = float(speed)
+        if not MIN_SPEED <= speed <= MAX_SPEED:
+            raise ValueError(f"speed must be between {MIN_SPEED} and {MAX_SPEED}")
+        if not self.paused:
+            self._anchor_t = self.race_time()
+            self._anchor_wall = self.clock()
+        self.speed = speed
+
+    def seek(self, frame: int = None, t: float = None):
+        """Jump to a frame index or a race time; the next tick starts there."""
+        if (frame is None) == (t is None):
+            raise ValueError("seek needs exactly one of frame or t")
+        if frame is None:
+            t = float(t)
+            if not np.isfinite(t):
+                raise ValueError("t must be a finite race time")
+            frame = int(np.searchsorted(self.timeline, t, side="left"))
+        frame = min(max(int(frame), 0), max(self.total_frames - 1, 0))
+
+        self.next_frame = frame
+        self.position = frame
+        self._anchor_t = float(self.timeline[frame]) if self.total_frames else 0.0
+        self._anchor_wall = self.clock()
+
+    def due_frames(self):
+        """
+        Frame range [start, stop) due since the last call, and advance past it.
+
+        While paused nothing is due. Playback pauses itself at the last frame.
+        """
+        if self.paused or self.finished:
+            return self.next_frame, self.next_frame
+
+        start = self.next_frame
+        stop = int(np.searchsorted(self.timeline, self.race_time(), side="right"))
+        stop = max(stop, start)
+        self.next_frame = stop
+        if stop > start:
+            self.position = stop - 1
+
+        if self.finished:
+            self._anchor_t = float(self.timeline[-1])
+            self.paused = True
+        return start, stop
+
+    def state(self):
+        """Playback state for the client."""
+        return {
+            "type": "state",
+            "frame": self.position,
+            "t": round(self.race_time(), 3),
+            "speed": self.speed,
+            "paused": self.paused,
+            "total_frames": self.total_frames,
+        }
@@ -0,0 +1,113 @@
+"""Pre-encoded, pre-compressed race telemetry pages.
+
+Historical races never change, so each fixed-size page of the paginated
+telemetry response is encoded and compressed once and kept next to the
+computed race data, under the page size it was cut with:
+
+    computed_data/<event>_race_telemetry/pages/1000/00003.json.gz
+    computed_data/<event>_race_telemetry/pages/1000/00003.json.br
+
+Requests for a whole page are then answered with the matching file and a
+Content-Encoding header, without slicing, encoding or compressing anything.
+The file is still read and sent in chunks by FileResponse, not sendfile.
+A race's pages are written together and renamed into place at once.
+Pages are stored as gzip and, with the ``brotli`` package from
+requirements.txt, as brotli; without it only gzip is written and served.
+"""
+import gzip
+import os
+import shutil
+import threading
+
+try:
+    import brotli
+except ImportError:  # Not installed: serve gzip only
+    brotli = None
+
+# Beyond these levels files barely shrink while compressing gets much slower
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+
+# Supported encodings, most preferred first
+PAGE_ENCODINGS = ("br", "gzip") if brotli is not None else ("gzip",)
+
+_SUFFIXES = {"br": ".json.br", "gzip": ".json.gz"}
+
+
+def _compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+
+
+def pages_dir(race_dir: str, page_frames: int) -> str:
+    return os.path.join(race_dir, "pages", str(page_frames))
+
+
+def _page_name(index: int, encoding: str) -> str:
+    return f"{index:05d}{_SUFFIXES[encoding]}"
+
+
+def page_path(race_dir: str, page_frames: int, index: int, encoding: str) -> str:
+    return os.path.join(pages_dir(race_dir, page_frames), _page_name(index, encoding))
+
+
+def accepted_encodings(accept_encoding: str):
+    """Page encodings allowed by an Accept-Encoding header, most preferred first."""
+    accepted = set()
+    for part in (accept_encoding or "").split(","):
+        token, _, params = part.strip().partition(";")
+        q = params.strip()
+        if q.startswith("q="):
+            try:
+                if float(q[2:]) <= 0:
+                    continue
+            except ValueError:
+                continue
+        accepted.add(token.strip().lower())
+
+    if "*" in accepted:
+        return list(PAGE_ENCODINGS)
+    return [encoding for encoding in PAGE_ENCODINGS if encoding in accepted]
+
+
+def write_pages(race_dir: str, page_frames: int, bodies, cancel: threading.Event) -> bool:
+    """
+    Compress every encoded page with every supported encoding and store them.
+
+    Pages are written to a temporary directory that replaces the race's
+    pages in one rename, so readers see all of a race's pages or none. Stops
+    without storing anything once cancel is set, or if race_dir no longer
+    exists (the race was invalidated). Returns whether the pages were stored.
+    """
+    if not os.path.isdir(race_dir):
+        return False
+    directory = pages_dir(race_dir, page_frames)
+    tmp_directory = f"{directory}.tmp-{os.getpid()}-{threading.get_ident()}"
+    os.makedirs(tmp_directory)
+    try:
+        for index, body in enumerate(bodies):
+            if cancel.is_set():
+                return False
+            for encoding in PAGE_ENCODINGS:
+                with open(os.path.join(tmp_directory, _page_name(index, encoding)), "wb") as f:
+                    f.write(_compress(body, encoding))
+
+        if cancel.is_set():
+            return False
+        if os.path.exists(directory):
+            shutil.rmtree(directory)
+        os.replace(tmp_directory, directory)
+        return True
+    finally:
+        if os.path.exists(tmp_directory):
+            shutil.rmtree(tmp_directory, ignore_errors=True)
+
+
+def find_page(race_dir: str, page_frames: int, index: int, encodings):
+    """Return (path, encoding) of the first stored encoding, or None."""
+    for encoding in encodings:
+        path = page_path(race_dir, page_frames, index, encoding)
+        if os.path.isfile(path):
+            return path, encoding
+    return None
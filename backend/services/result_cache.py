@@ -0,0 +1,147 @@
+"""Two-tier cache for computed telemetry results.
+
+Tier 1 keeps hot results in memory (LRU with a byte budget). Tier 2 is the
+computed data on disk; a tier-1 miss that finds the result on disk promotes
+it into memory, and only a miss on both tiers runs the full computation.
+"""
+import sys
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+
+def estimate_result_bytes(value) -> int:
+    """
+    Estimate the resident memory of a computed result.
+
+    Memory-mapped arrays count only their object overhead, since their data
+    lives in the OS page cache rather than in this process.
+    """
+    if isinstance(value, np.memmap):
+        return sys.getsizeof(value)
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(
+            estimate_result_bytes(k) + estimate_result_bytes(v) for k, v in value.items()
+        )
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(estimate_result_bytes(v) for v in value)
+    if hasattr(value, "__dict__"):
+        return sys.getsizeof(value) + estimate_result_bytes(vars(value))
+    return sys.getsizeof(value)
+
+
+class _TierStats:
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+
+    def as_dict(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+        }
+
+
+class ResultCache:
+    """
+    Memory tier over the on-disk computed data.
+
+    Keys are tuples such as ("race", year, round, session_type). Callers pass
+    the disk loader and the compute function on lookup, so the cache doesn't
+    need to know how results are stored.
+    """
+
+    def __init__(self, max_bytes: int, sizeof=estimate_result_bytes):
+        self.max_bytes = max_bytes
+        self._sizeof = sizeof
+        self._entries = OrderedDict()  # key -> (value, size in bytes)
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+        self.memory_stats = _TierStats()
+        self.disk_stats = _TierStats()
+
+    def get(self, key, load_from_disk, compute):
+        """
+        Return the result for key from memory, then disk, then by computing it.
+
+        load_from_disk() returns None when the result isn't on disk; compute()
+        is expected to write the result to disk as well as return it.
+        """
+        value = self.get_from_memory(key)
+        if value is not None:
+            return value
+
+        value = load_from_disk()
+        with self._lock:
+            if value is not None:
+                self.disk_stats.hits += 1
+            else:
+                self.disk_stats.misses += 1
+
+        if value is None:
+            value = compute()
+
+        self.put(key, value)
+        return value
+
+    def get_from_memory(self, key):
+        """Return the in-memory result for key (marking it recently used), or None."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.memory_stats.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.memory_stats.hits += 1
+            return entry[0]
+
+    def put(self, key, value):
+        """Hold a result in memory, evicting least-recently-used results over the budget."""
+        size = self._sizeof(value)
+        with self._lock:
+            self._discard(key)
+            if size > self.max_bytes:
+                return
+            self._entries[key] = (value, size)
+            self._total_bytes += size
+            while self._total_bytes > self.max_bytes:
+                self._discard(next(iter(self._entries)))
+
+    def invalidate(self, key=None, match=None):
+        """
+        Drop results from memory.
+
+        With key, drops that entry. With match, drops every entry whose key
+        satisfies match(key). With neither, clears the memory tier.
+        """
+        with self._lock:
+            if key is not None:
+                self._discard(key)
+            elif match is not None:
+                for cached_key in [k for k in self._entries if match(k)]:
+                    self._discard(cached_key)
+            else:
+                self._entries.clear()
+                self._total_bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "memory": {
+                    **self.memory_stats.as_dict(),
+                    "entries": len(self._entries),
+                    "bytes": self._total_bytes,
+                    "max_bytes": self.max_bytes,
+                },
+                "disk": self.disk_stats.as_dict(),
+            }
+
+    def _discard(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._total_bytes -= entry[1]
@@ -0,0 +1,119 @@
+"""Process-wide LRU cache of loaded FastF1 sessions."""
+import threading
+from collections import OrderedDict
+
+# Session attributes that hold the bulk of a loaded session's memory
+_SESSION_FRAMES = ("laps", "results", "weather_data", "track_status", "race_control_messages")
+_SESSION_TELEMETRY = ("car_data", "pos_data")
+
+
+def estimate_session_bytes(session) -> int:
+    """
+    Estimate the memory held by a loaded FastF1 session.
+
+    Sums the shallow memory usage of the session's DataFrames and of the
+    per-driver car/position telemetry. Attributes that were not loaded are
+    skipped (FastF1 raises when they are accessed).
+    """
+    total = 0
+    for name in _SESSION_FRAMES:
+        try:
+            frame = getattr(session, name)
+        except Exception:
+            continue
+        if hasattr(frame, "memory_usage"):
+            total += int(frame.memory_usage(index=True).sum())
+
+    for name in _SESSION_TELEMETRY:
+        try:
+            per_driver = getattr(session, name)
+        except Exception:
+            continue
+        for frame in (per_driver or {}).values():
+            if hasattr(frame, "memory_usage"):
+                total += int(frame.memory_usage(index=True).sum())
+
+    return total
+
+
+class SessionCache:
+    """
+    Bounded LRU cache of loaded sessions keyed by (year, round, session_type).
+
+    Entries are evicted least-recently-used first once either the entry cap
+    or the memory budget is exceeded. A session larger than the whole budget
+    is returned to the caller but not cached.
+    """
+
+    def __init__(self, max_entries: int, max_bytes: int, sizeof=estimate_session_bytes):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._sizeof = sizeof
+        self._entries = OrderedDict()  # key -> (session, size in bytes)
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __contains__(self, key):
+        """Whether key is cached, without counting a hit or marking it used."""
+        with self._lock:
+            return key in self._entries
+
+    def get(self, key):
+        """Return the cached session for key (marking it recently used), or None."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, session):
+        """Add a session, evicting least-recently-used entries to stay within bounds."""
+        size = self._sizeof(session)
+        with self._lock:
+            self._discard(key)
+            if size > self.max_bytes or self.max_entries <= 0:
+                return
+            self._entries[key] = (session, size)
+            self._total_bytes += size
+            while len(self._entries) > self.max_entries or self._total_bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._discard(oldest)
+                self.evictions += 1
+
+    def get_or_load(self, key, loader):
+        """Return the cached session for key, calling loader() on a miss."""
+        session = self.get(key)
+        if session is None:
+            session = loader()
+            self.put(key, session)
+        return session
+
+    def invalidate(self, key):
+        """Drop a single session from the cache."""
+        with self._lock:
+            self._discard(key)
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "bytes": self._total_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+            }
+
+    def _discard(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._total_bytes -= entry[1]
@@ -0,0 +1,94 @@
+"""Single-flight coalescing of duplicate cold computations.
+
+When several requests need the same result at once, only the first runs the
+computation; the rest wait for it and share its result (or its exception).
+Within a process this uses a dict of in-flight calls. Across uvicorn workers
+an exclusive file lock per key serialises the computation, so a worker that
+waited on the lock finds the result already on disk.
+"""
+import os
+import threading
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows: fall back to in-process coalescing only
+    fcntl = None
+
+
+@contextmanager
+def file_lock(path):
+    """Hold an exclusive advisory lock on path for the duration of the block."""
+    if fcntl is None:
+        yield
+        return
+
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "a+") as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Run at most one call per key at a time, sharing its outcome with waiters.
+
+    Args:
+        lock_dir: Directory for per-key lock files used to coalesce across
+            processes. None disables the file lock.
+    """
+
+    def __init__(self, lock_dir=None):
+        self.lock_dir = lock_dir
+        self._lock = threading.Lock()
+        self._calls = {}
+        self.coalesced = 0
+
+    def do(self, key, fn):
+        """Return fn(), or the result of an identical call already in flight."""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            with self._process_lock(key):
+                call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def _process_lock(self, key):
+        if self.lock_dir is None:
+            return _null_lock()
+        name = "_".join(str(part) for part in key)
+        return file_lock(os.path.join(self.lock_dir, f"{name}.lock"))
+
+
+@contextmanager
+def _null_lock():
+    yield
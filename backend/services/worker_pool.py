@@ -0,0 +1,136 @@
+"""Long-lived process pool for per-driver telemetry extraction.
+
+get_race_telemetry and get_quali_telemetry fan out one task per driver.
+Starting a new multiprocessing.Pool for every session pays for process
+start-up and the fastf1/numpy/pandas imports each time, so the service keeps
+one pool for the life of the process and hands it to the pipeline.
+
+Workers are started from a forkserver (spawn where that isn't available),
+not forked from the threaded API process, import the heavy modules once when
+they start, and are replaced after a fixed number of tasks so memory
+fragmented by large sessions is given back. A session whose tasks don't
+finish within the timeout fails, and new maps go to a fresh pool; the old
+pool's workers are terminated once no other map is still running on it.
+"""
+import multiprocessing
+import threading
+
+from core.config import WORKER_POOL_PROCESSES, WORKER_POOL_MAX_TASKS, WORKER_POOL_TIMEOUT_SECONDS
+
+# Forking a process that runs threads can copy a lock another thread holds
+_START_METHOD = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+
+
+def _warm_imports():
+    """Pool initializer: import the heavy modules before the first task arrives."""
+    import fastf1  # noqa: F401
+    import numpy  # noqa: F401
+    import pandas  # noqa: F401
+    import f1_data  # noqa: F401
+
+
+class WorkerPool:
+    """
+    Process pool shared by every session computation.
+
+    Args:
+        processes: Number of worker processes
+        max_tasks_per_child: Tasks a worker runs before it is replaced
+        timeout: Default seconds a map() may take before its workers are killed
+    """
+
+    def __init__(self, processes: int, max_tasks_per_child: int, timeout: float):
+        self.processes = processes
+        self.max_tasks_per_child = max_tasks_per_child
+        self.timeout = timeout
+        self.restarts = 0
+        self._pool = None
+        # Maps running on each pool, including pools already replaced
+        self._in_flight = {}
+        self._lock = threading.Lock()
+
+    def _get_pool(self):
+        # Callers hold self._lock
+        if self._pool is None:
+            self._pool = multiprocessing.get_context(_START_METHOD).Pool(
+                processes=self.processes,
+                initializer=_warm_imports,
+                maxtasksperchild=self.max_tasks_per_child,
+            )
+        return self._pool
+
+    def map(self, fn, iterable, timeout=None):
+        """
+        Pool.map with a timeout covering the whole call.
+
+        Raises TimeoutError if the results aren't all in after timeout
+        seconds. Later maps then start a new pool; this one is terminated
+        once the other maps running on it have finished.
+        """
+        timeout = timeout or self.timeout
+        pool = self._acquire()
+        try:
+            result = pool.map_async(fn, list(iterable), chunksize=1)
+            try:
+                return result.get(timeout)
+            except multiprocessing.TimeoutError:
+                self._replace(pool)
+                raise TimeoutError(f"Worker pool tasks did not finish within {timeout:g} seconds")
+        finally:
+            self._release(pool)
+
+    def _acquire(self):
+        # Count the map in the same step, so a timeout elsewhere can't
+        # terminate the pool before this map is running on it
+        with self._lock:
+            pool = self._get_pool()
+            self._in_flight[pool] = self._in_flight.get(pool, 0) + 1
+        return pool
+
+    def _release(self, pool):
+        with self._lock:
+            self._in_flight[pool] -= 1
+            if self._in_flight[pool]:
+                return
+            del self._in_flight[pool]
+            replaced = pool is not self._pool
+        if replaced:
+            pool.terminate()
+
+    def _replace(self, pool):
+        with self._lock:
+            # Another map may already have replaced it
+            if self._pool is pool:
+                self._pool = None
+                self.restarts += 1
+
+    def stats(self):
+        return {
+            "processes": self.processes,
+            "max_tasks_per_child": self.max_tasks_per_child,
+            "running": self._pool is not None,
+            "maps_in_flight": sum(self._in_flight.values()),
+            "restarts": self.restarts,
+        }
+
+    def shutdown(self):
+        with self._lock:
+            pools = set(self._in_flight) | ({self._pool} if self._pool is not None else set())
+            self._pool = None
+        for pool in pools:
+            pool.terminate()
+
+
+# Singleton instance
+_worker_pool = None
+
+def get_worker_pool() -> WorkerPool:
+    """Get singleton worker pool instance."""
+    global _worker_pool
+    if _worker_pool is None:
+        _worker_pool = WorkerPool(
+            processes=WORKER_POOL_PROCESSES,
+            max_tasks_per_child=WORKER_POOL_MAX_TASKS,
+            timeout=WORKER_POOL_TIMEOUT_SECONDS,
+        )
+    return _worker_pool
@@ -5,7 +5,7 @@ from pathlib import Path
 # Add the f1_integration directory to Python path
 sys.path.insert(0, str(Path(__file__).parent / "core" / "f1_integration"))
 
-from f1_data import load_session, enable_cache, _process_single_driver
+from f1_data import load_session, enable_cache, _driver_slice, _process_single_driver
 
 enable_cache()
 
@@ -20,7 +20,7 @@ driver_code = session.get_driver(first_driver)["Abbreviation"]
 print(f"Testing driver: {driver_code}")
 
 # Process the driver
-result = _process_single_driver((first_driver, session, driver_code))
+result = _process_single_driver((driver_code, *_driver_slice(session, first_driver)))
 
 if result:
     data = result["data"]
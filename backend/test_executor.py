@@ -0,0 +1,90 @@
+"""Tests for running cold work off the request thread pool."""
+import asyncio
+import threading
+import time
+
+import pytest
+
+from services.executor import BlockingExecutor, defer_cold_work
+
+
+class FakeCache:
+    """A result that takes `seconds` to compute, and one that is already cached."""
+
+    def __init__(self, seconds):
+        self.seconds = seconds
+        self.values = {"cached": "hit"}
+        self.computations = 0
+        self._lock = threading.Lock()
+
+    def compute(self, key):
+        with self._lock:
+            self.computations += 1
+        time.sleep(self.seconds)
+        self.values[key] = "computed"
+
+    def read(self, key):
+        if key not in self.values:
+            defer_cold_work(key, lambda: self.compute(key))
+            self.compute(key)
+        return self.values[key]
+
+
+def test_cached_reads_do_not_wait_behind_cold_work():
+    executor = BlockingExecutor(max_workers=2, timeout=5, cold_max_workers=1)
+    cache = FakeCache(seconds=1)
+
+    async def scenario():
+        # More waiters on the cold result than there are request threads
+        cold = [asyncio.ensure_future(executor.run(cache.read, "race")) for _ in range(6)]
+        await asyncio.sleep(0.1)
+
+        start = time.perf_counter()
+        assert await executor.run(cache.read, "cached") == "hit"
+        cached_seconds = time.perf_counter() - start
+
+        return cached_seconds, await asyncio.gather(*cold)
+
+    try:
+        cached_seconds, cold_results = asyncio.run(scenario())
+        assert cached_seconds < 0.5
+        assert cold_results == ["computed"] * 6
+        assert cache.computations == 1
+    finally:
+        executor.shutdown()
+
+
+def test_timed_out_waiter_leaves_cold_work_running():
+    executor = BlockingExecutor(max_workers=2, timeout=5, cold_max_workers=1)
+    cache = FakeCache(seconds=0.5)
+
+    async def scenario():
+        waiter = asyncio.ensure_future(executor.run(cache.read, "race"))
+        with pytest.raises(asyncio.TimeoutError):
+            await executor.run(cache.read, "race", timeout=0.1)
+        return await waiter
+
+    try:
+        assert asyncio.run(scenario()) == "computed"
+        assert cache.computations == 1
+    finally:
+        executor.shutdown()
+
+
+def test_cold_work_failure_is_raised_inside_the_call():
+    executor = BlockingExecutor(max_workers=2, timeout=5, cold_max_workers=1)
+
+    def fail():
+        raise ValueError("unknown driver")
+
+    def read():
+        try:
+            defer_cold_work("lap", fail)
+            fail()
+        except ValueError:
+            return None
+
+    try:
+        assert asyncio.run(executor.run(read)) is None
+    finally:
+        executor.shutdown()
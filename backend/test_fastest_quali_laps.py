@@ -0,0 +1,48 @@
+"""Test that the grouped fastest-lap pass picks the same laps as Laps.pick_fastest()."""
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from fastf1.core import Laps
+
+# Add the f1_integration directory to Python path
+sys.path.insert(0, str(Path(__file__).parent / "core" / "f1_integration"))
+
+from f1_data import QUALI_SEGMENTS, _fastest_quali_laps
+
+
+def synthetic_segments(num_drivers=20, laps_per_segment=6, seed=0):
+    rng = np.random.default_rng(seed)
+    segments = {}
+    for segment in QUALI_SEGMENTS:
+        rows = []
+        for driver in range(1, num_drivers + 1):
+            for lap in range(laps_per_segment):
+                # Coarse times so some laps tie; some laps deleted or untimed
+                lap_time = pd.Timedelta(seconds=80 + int(rng.integers(0, 4)))
+                rows.append({
+                    "Driver": f"D{driver:02d}",
+                    "DriverNumber": str(driver),
+                    "LapNumber": float(lap + 1),
+                    "LapTime": pd.NaT if rng.random() < 0.1 else lap_time,
+                    "IsPersonalBest": bool(rng.random() < 0.7),
+                })
+        segments[segment] = Laps(pd.DataFrame(rows))
+    segments["Q3"] = None
+    return segments
+
+
+def test_matches_pick_fastest():
+    segments = synthetic_segments()
+    fastest = _fastest_quali_laps(segments)
+
+    for segment, laps in segments.items():
+        for driver in [f"D{driver:02d}" for driver in range(1, 21)]:
+            picked = fastest[(fastest["Segment"] == segment) & (fastest["Driver"] == driver)]
+            expected = None if laps is None else laps.pick_drivers(driver).pick_fastest()
+            if expected is None:
+                assert picked.empty
+            else:
+                assert len(picked) == 1
+                assert picked.iloc[0]["LapNumber"] == expected["LapNumber"]
@@ -0,0 +1,103 @@
+"""Round-trip test for the binary frame page encoding."""
+import json
+import sys
+from pathlib import Path
+
+import numpy as np
+
+# Add the f1_integration directory to Python path
+sys.path.insert(0, str(Path(__file__).parent / "core" / "f1_integration"))
+
+from frame_codec import decode_delta_page, decode_frame_page, encode_delta_page, encode_frame_page
+from frame_store import DRIVER_FIELDS, RaceFrameStore
+
+
+def synthetic_store(num_drivers=20, num_frames=1500, seed=0):
+    rng = np.random.default_rng(seed)
+    columns = {}
+    for field, (dtype, decimals) in DRIVER_FIELDS.items():
+        if decimals is None:
+            columns[field] = rng.integers(0, 20, (num_drivers, num_frames))
+        else:
+            columns[field] = rng.uniform(-5000, 5000, (num_drivers, num_frames))
+    columns["position"] = np.argsort(rng.random((num_drivers, num_frames)), axis=0) + 1
+
+    return RaceFrameStore.from_arrays(
+        timeline=np.arange(num_frames) / 25,
+        driver_codes=[f"D{j:02d}" for j in range(num_drivers)],
+        columns=columns,
+        leader_lap=rng.integers(1, 60, num_frames),
+        weather={"track_temp": rng.uniform(20, 50, num_frames), "rainfall": rng.random(num_frames)},
+    )
+
+
+def test_round_trip_matches_store_slice():
+    store = synthetic_store()
+    payload = encode_frame_page(store, 200, 1200, {"total_laps": 57})
+    header, arrays = decode_frame_page(payload)
+
+    assert header["start_frame"] == 200 and header["end_frame"] == 1200
+    assert header["num_frames"] == 1000 and header["total_laps"] == 57
+    assert header["driver_codes"] == store.driver_codes
+
+    np.testing.assert_array_equal(arrays["t"], store.timeline[200:1200])
+    np.testing.assert_array_equal(arrays["lap"], store.leader_lap[200:1200])
+    for field, values in store.columns.items():
+        assert arrays[f"col_{field}"].dtype == values.dtype
+        np.testing.assert_array_equal(arrays[f"col_{field}"], values[:, 200:1200])
+    for name, values in store.weather.items():
+        np.testing.assert_array_equal(arrays[f"weather_{name}"], values[200:1200])
+
+    # Much smaller than the same page as JSON frames
+    assert len(payload) * 5 < len(json.dumps(store.frames(200, 1200)))
+
+
+def test_empty_page_and_bad_payload():
+    store = synthetic_store(num_frames=10)
+    header, arrays = decode_frame_page(encode_frame_page(store, 10, 20))
+    assert header["num_frames"] == 0 and arrays["col_x"].shape == (20, 0)
+
+    try:
+        decode_frame_page(b"{}")
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("expected ValueError")
+
+
+def test_delta_round_trip_matches_json_precision():
+    store = synthetic_store(num_frames=1000)
+    # Smooth, mostly unchanging columns like a real race, plus one big jump
+    store.columns["x"][:] = np.cumsum(np.full((20, 1000), 3.5, dtype=np.float32), axis=1)
+    store.columns["x"][3, 400:] += 1000
+    store.columns["y"][:] = np.cumsum(np.full((20, 1000), -1.25, dtype=np.float32), axis=1)
+    store.columns["lap"][:] = 12
+    store.columns["gear"][:] = 5
+    store.columns["gear"][7, 500:] = 6
+
+    payload = encode_delta_page(store, 100, 900, {"total_laps": 57}, keyframe_interval=50)
+    header, arrays = decode_delta_page(payload)
+    assert header["num_frames"] == 800 and header["total_laps"] == 57
+
+    for field, (_, decimals) in DRIVER_FIELDS.items():
+        expected = store.columns[field][:, 100:900]
+        if decimals is None:
+            np.testing.assert_array_equal(arrays[f"col_{field}"], expected)
+        else:
+            np.testing.assert_allclose(arrays[f"col_{field}"], expected, rtol=0, atol=0.5 / 10 ** decimals + 1e-3)
+    np.testing.assert_array_equal(arrays["t"], store.timeline[100:900])
+
+    # Projection, and smaller than the plain binary page for the same columns
+    fields = ["x", "y", "lap", "gear"]
+    delta = encode_delta_page(store, 0, 1000, drivers=["D03", "D01"], fields=fields)
+    plain = encode_frame_page(store, 0, 1000, drivers=["D03", "D01"], fields=fields)
+    header, arrays = decode_delta_page(delta)
+    assert header["driver_codes"] == ["D03", "D01"] and arrays["col_gear"].shape == (2, 1000)
+    assert len(delta) < len(plain)
+
+
+if __name__ == "__main__":
+    test_round_trip_matches_store_slice()
+    test_empty_page_and_bad_payload()
+    test_delta_round_trip_matches_json_precision()
+    print("Binary frame pages round-trip.")
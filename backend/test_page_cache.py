@@ -0,0 +1,41 @@
+"""Tests for writing pre-compressed race telemetry pages."""
+import gzip
+import os
+import threading
+
+from services import page_cache
+
+
+def _bodies(count):
+    return (f'{{"page": {index}}}'.encode() for index in range(count))
+
+
+def test_pages_replace_the_previous_ones(tmp_path):
+    race_dir = str(tmp_path)
+    assert page_cache.write_pages(race_dir, 1000, _bodies(3), threading.Event())
+    assert page_cache.write_pages(race_dir, 1000, _bodies(2), threading.Event())
+
+    assert sorted(os.listdir(os.path.join(race_dir, "pages"))) == ["1000"]
+    assert page_cache.find_page(race_dir, 1000, 2, ["gzip"]) is None
+    path, encoding = page_cache.find_page(race_dir, 1000, 1, ["gzip"])
+    with open(path, "rb") as f:
+        assert gzip.decompress(f.read()) == b'{"page": 1}'
+
+
+def test_cancelled_write_stores_nothing(tmp_path):
+    race_dir = str(tmp_path)
+    cancel = threading.Event()
+
+    def bodies():
+        yield b"{}"
+        cancel.set()
+        yield b"{}"
+
+    assert not page_cache.write_pages(race_dir, 1000, bodies(), cancel)
+    assert os.listdir(os.path.join(race_dir, "pages")) == []
+
+
+def test_missing_race_dir_is_not_recreated(tmp_path):
+    race_dir = str(tmp_path / "invalidated")
+    assert not page_cache.write_pages(race_dir, 1000, _bodies(1), threading.Event())
+    assert not os.path.exists(race_dir)
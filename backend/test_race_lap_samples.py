@@ -0,0 +1,108 @@
+"""Test that the single-merge race extraction matches the per-lap telemetry path."""
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from fastf1.core import Telemetry
+
+# Add the f1_integration directory to Python path
+sys.path.insert(0, str(Path(__file__).parent / "core" / "f1_integration"))
+
+from f1_data import _SessionClock, _lap_telemetry, _process_single_driver, _worker_laps
+
+TRACK_LENGTH = 5000.0
+
+# Metres. Distance is integrated from the same Speed samples either way, up
+# to floating point error summed over the race
+DIST_TOLERANCE = 0.5
+# Metres. X/Y are interpolated between the same position samples either way
+XY_TOLERANCE = 0.1
+
+
+def track_xy(dist):
+    a = 2 * np.pi * (dist % TRACK_LENGTH) / TRACK_LENGTH
+    return 3000 * np.cos(a) + 500 * np.cos(3 * a), 2000 * np.sin(a)
+
+
+def synthetic_driver(num_laps=5, seed=0):
+    """One driver's laps and car/position telemetry, as _driver_slice returns them."""
+    rng = np.random.default_rng(seed)
+    clock = _SessionClock(pd.Timestamp("2024-01-01 12:00:00"))
+    speed = 60 + 3 * rng.random()
+    lap_time = TRACK_LENGTH / speed
+    start = 100.0
+    end = start + num_laps * lap_time
+
+    # Car and position data at different, offset rates, as in a real session
+    car_t = np.arange(start - 2, end + 2, 0.27)
+    pos_t = np.arange(start - 2.1, end + 2, 0.22)
+
+    car_data = Telemetry({
+        "Date": clock.t0_date + pd.to_timedelta(car_t, unit="s"),
+        "SessionTime": pd.to_timedelta(car_t, unit="s"),
+        "Time": pd.to_timedelta(car_t - car_t[0], unit="s"),
+        "Speed": speed * 3.6 + rng.normal(0, 3, len(car_t)),
+        "RPM": np.full(len(car_t), 10000.0),
+        "nGear": rng.integers(1, 9, len(car_t)),
+        "Throttle": rng.random(len(car_t)) * 100,
+        "Brake": rng.random(len(car_t)) > 0.8,
+        "DRS": rng.choice([0, 8, 12], len(car_t)),
+        "Source": "car",
+    }, session=clock, driver="1")
+
+    xs, ys = track_xy((pos_t - start) * speed)
+    pos_data = Telemetry({
+        "Date": clock.t0_date + pd.to_timedelta(pos_t, unit="s"),
+        "SessionTime": pd.to_timedelta(pos_t, unit="s"),
+        "Time": pd.to_timedelta(pos_t - pos_t[0], unit="s"),
+        "X": xs,
+        "Y": ys,
+        "Z": np.zeros(len(pos_t)),
+        "Status": "OnTrack",
+        "Source": "pos",
+    }, session=clock, driver="1")
+
+    laps = pd.DataFrame({
+        "Driver": "D01",
+        "DriverNumber": "1",
+        "LapNumber": np.arange(1, num_laps + 1, dtype=float),
+        "LapStartTime": pd.to_timedelta(start + np.arange(num_laps) * lap_time, unit="s"),
+        "Time": pd.to_timedelta(start + np.arange(1, num_laps + 1) * lap_time, unit="s"),
+        "Compound": "MEDIUM",
+    })
+    return laps, car_data, pos_data
+
+
+def per_lap_reference(laps, car_data, pos_data):
+    """Time, X, Y, race distance and lap number the per-lap path produced."""
+    t, x, y, dist, lap_numbers = [], [], [], [], []
+    total_dist_so_far = 0.0
+    for _, lap in _worker_laps(laps, car_data).iterlaps():
+        lap_tel = _lap_telemetry(lap, car_data, pos_data)
+        d_lap = lap_tel["Distance"].to_numpy()
+        t.append(lap_tel["SessionTime"].dt.total_seconds().to_numpy())
+        x.append(lap_tel["X"].to_numpy())
+        y.append(lap_tel["Y"].to_numpy())
+        dist.append(total_dist_so_far + d_lap)
+        lap_numbers.append(np.full(len(d_lap), lap.LapNumber))
+        total_dist_so_far += d_lap.max()
+
+    t, x, y, dist, lap_numbers = [np.concatenate(arr) for arr in (t, x, y, dist, lap_numbers)]
+    order = np.argsort(t, kind="stable")
+    return t[order], x[order], y[order], dist[order], lap_numbers[order]
+
+
+def test_matches_per_lap_telemetry():
+    laps, car_data, pos_data = synthetic_driver()
+    t, x, y, dist, lap_numbers = per_lap_reference(laps, car_data, pos_data)
+
+    data = _process_single_driver(("D01", laps, car_data, pos_data))["data"]
+
+    # Same samples, in the same order, on the same laps
+    np.testing.assert_allclose(data["t"], t, rtol=0, atol=1e-6)
+    np.testing.assert_array_equal(data["lap"], lap_numbers)
+
+    np.testing.assert_allclose(data["dist"], dist, rtol=0, atol=DIST_TOLERANCE)
+    np.testing.assert_allclose(data["x"], x, rtol=0, atol=XY_TOLERANCE)
+    np.testing.assert_allclose(data["y"], y, rtol=0, atol=XY_TOLERANCE)
@@ -0,0 +1,117 @@
+"""Regression test: array-based race progress smoothing matches the per-frame loop."""
+import sys
+from pathlib import Path
+
+import numpy as np
+
+# Add the f1_integration directory to Python path
+sys.path.insert(0, str(Path(__file__).parent / "core" / "f1_integration"))
+
+from f1_data import _smooth_race_progress
+
+TRACK_LENGTH = 5000.0
+
+
+def reference_race_progress(driver_codes, laps, projected_dists, track_length):
+    """The original frame-by-frame smoothing loop from get_race_telemetry."""
+    num_frames = laps.shape[1]
+    race_progress_all = np.zeros(laps.shape)
+
+    prev_race_progress = {code: 0.0 for code in driver_codes}
+    prev_lap = {code: 1 for code in driver_codes}
+    prev_projected_dist = {code: 0.0 for code in driver_codes}
+
+    for i in range(num_frames):
+        for j, code in enumerate(driver_codes):
+            lap = int(laps[j, i])
+            projected_dist = projected_dists[j, i]
+
+            race_progress = (max(lap, 1) - 1) * track_length + projected_dist
+
+            if race_progress < prev_race_progress[code]:
+                backward_jump = prev_race_progress[code] - race_progress
+
+                is_lap_completion = (lap > prev_lap[code]) and (projected_dist < 0.3 * track_length)
+                is_distance_wrap = (prev_projected_dist[code] > 0.7 * track_length) and (projected_dist < 0.3 * track_length)
+
+                if is_lap_completion or is_distance_wrap:
+                    pass
+                elif backward_jump < 10.0:
+                    race_progress = prev_race_progress[code] + 1.0
+                else:
+                    pass
+
+            prev_race_progress[code] = race_progress
+            prev_lap[code] = lap
+            prev_projected_dist[code] = projected_dist
+
+            race_progress_all[j, i] = race_progress
+
+    return race_progress_all
+
+
+def synthetic_race(seed, num_drivers=20, num_frames=6000):
+    """
+    Laps and projected distances for a noisy synthetic race.
+
+    Includes GPS jitter (small backward jumps), lap counters that tick over
+    slightly before or after the line, cars parked for a while, and the odd
+    large backward jump.
+    """
+    rng = np.random.default_rng(seed)
+    laps = np.zeros((num_drivers, num_frames), dtype=np.int16)
+    projected = np.zeros((num_drivers, num_frames))
+
+    for j in range(num_drivers):
+        speed = rng.uniform(50, 80) / 25  # metres per frame
+        progress = np.cumsum(np.full(num_frames, speed)) - rng.uniform(0, 200)
+        stop = rng.integers(0, num_frames)
+        progress[stop:stop + 200] = progress[stop]
+        progress[stop + 200:] -= 200 * speed
+
+        progress += rng.normal(0, 4, num_frames)
+        jumps = rng.random(num_frames) < 0.002
+        progress[jumps] -= rng.uniform(10, 300, jumps.sum())
+
+        lap_offset = rng.integers(-3, 4)
+        laps[j] = np.clip(np.floor(np.roll(progress, lap_offset) / TRACK_LENGTH), 0, None) + 1
+        projected[j] = np.mod(progress, TRACK_LENGTH)
+
+    # Occasional readings exactly on the line and lap counters held at zero
+    projected[rng.random(projected.shape) < 0.001] = 0.0
+    laps[:, :10] = 0
+
+    return laps, projected
+
+
+def test_smoothing_matches_per_frame_loop():
+    for seed in range(5):
+        laps, projected = synthetic_race(seed)
+        driver_codes = [f"D{j:02d}" for j in range(laps.shape[0])]
+
+        expected = reference_race_progress(driver_codes, laps, projected, TRACK_LENGTH)
+        actual = np.vstack([
+            _smooth_race_progress(laps[j], projected[j], TRACK_LENGTH)
+            for j in range(laps.shape[0])
+        ])
+
+        np.testing.assert_array_equal(actual, expected)
+
+        # Identical progress must give identical positions
+        expected_order = np.argsort(-expected, axis=0, kind="stable")
+        actual_order = np.argsort(-actual, axis=0, kind="stable")
+        np.testing.assert_array_equal(actual_order, expected_order)
+
+
+def test_smoothing_handles_empty_and_single_frame():
+    assert len(_smooth_race_progress(np.array([], dtype=np.int16), np.array([]), TRACK_LENGTH)) == 0
+    np.testing.assert_array_equal(
+        _smooth_race_progress(np.array([2]), np.array([100.0]), TRACK_LENGTH),
+        [TRACK_LENGTH + 100.0],
+    )
+
+
+if __name__ == "__main__":
+    test_smoothing_matches_per_frame_loop()
+    test_smoothing_handles_empty_and_single_frame()
+    print("Race progress smoothing matches the per-frame loop.")
@@ -0,0 +1,60 @@
+"""Test TrackIndex nearest-point queries against a brute-force scan."""
+import sys
+from pathlib import Path
+
+import numpy as np
+
+# Add the f1_integration directory to Python path
+sys.path.insert(0, str(Path(__file__).parent / "core" / "f1_integration"))
+
+from track_index import TrackIndex
+
+
+def closed_lap(num_points=4000):
+    """Reference polyline of a closed lap, first and last points coinciding."""
+    a = np.linspace(0, 2 * np.pi, num_points - 1, endpoint=False)
+    xs = np.append(3000 * np.cos(a) + 500 * np.cos(3 * a), 0)
+    ys = np.append(2000 * np.sin(a), 0)
+    xs[-1], ys[-1] = xs[0], ys[0]
+    dists = np.concatenate([[0.0], np.cumsum(np.hypot(np.diff(xs), np.diff(ys)))])
+    return TrackIndex(xs, ys, dists)
+
+
+def brute_force_nearest(index, x, y):
+    # argmin returns the first (lowest) index on a tie
+    return int(np.argmin((index.xs - x)**2 + (index.ys - y)**2))
+
+
+def test_nearest_matches_brute_force():
+    index = closed_lap()
+    rng = np.random.default_rng(0)
+    picks = rng.integers(0, len(index), 500)
+    xs = index.xs[picks] + rng.normal(0, 20, len(picks))
+    ys = index.ys[picks] + rng.normal(0, 20, len(picks))
+
+    expected = [brute_force_nearest(index, x, y) for x, y in zip(xs, ys)]
+    assert index.nearest(xs, ys).tolist() == expected
+
+
+def test_nearest_breaks_ties_towards_lower_index():
+    index = closed_lap()
+    # The start/finish point is both index 0 and the last index
+    x, y = index.xs[-1], index.ys[-1]
+    assert brute_force_nearest(index, x, y) == 0
+    assert index.nearest(x, y).tolist() == [0]
+    assert index.nearest_in_window(x, y, hint=len(index) - 10) == 0
+
+
+def test_nearest_in_window_matches_brute_force():
+    index = closed_lap()
+    rng = np.random.default_rng(1)
+    for true_idx in rng.integers(0, len(index), 300):
+        x = index.xs[true_idx] + rng.normal(0, 10)
+        y = index.ys[true_idx] + rng.normal(0, 10)
+        expected = brute_force_nearest(index, x, y)
+
+        # A hint close by is searched locally, one far away falls back to the KD-tree
+        near_hint = (true_idx + int(rng.integers(-20, 21))) % len(index)
+        far_hint = (true_idx + len(index) // 2) % len(index)
+        assert index.nearest_in_window(x, y, near_hint) == expected
+        assert index.nearest_in_window(x, y, far_hint) == expected
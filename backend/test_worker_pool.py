@@ -0,0 +1,76 @@
+"""Tests for the long-lived per-driver worker pool."""
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+# Add the f1_integration directory to Python path (workers import f1_data on start)
+sys.path.insert(0, str(Path(__file__).parent / "core" / "f1_integration"))
+
+from services.worker_pool import WorkerPool
+
+
+def _pid(_):
+    return os.getpid()
+
+
+def _square(x):
+    return x * x
+
+
+def _slow_square(x):
+    time.sleep(2)
+    return x * x
+
+
+def test_workers_are_reused_across_maps():
+    pool = WorkerPool(processes=2, max_tasks_per_child=100, timeout=60)
+    try:
+        first = set(pool.map(_pid, range(8)))
+        second = set(pool.map(_pid, range(8)))
+        assert len(first | second) <= 2
+        assert pool.map(_square, [1, 2, 3]) == [1, 4, 9]
+    finally:
+        pool.shutdown()
+
+
+def test_workers_are_replaced_after_max_tasks():
+    pool = WorkerPool(processes=1, max_tasks_per_child=2, timeout=60)
+    try:
+        assert len(set(pool.map(_pid, range(6)))) == 3
+    finally:
+        pool.shutdown()
+
+
+def test_timeout_restarts_the_pool():
+    pool = WorkerPool(processes=1, max_tasks_per_child=100, timeout=60)
+    try:
+        with pytest.raises(TimeoutError):
+            pool.map(time.sleep, [5], timeout=0.5)
+        assert pool.restarts == 1
+        assert pool.map(_square, [4]) == [16]
+    finally:
+        pool.shutdown()
+
+
+def test_timeout_leaves_other_maps_running():
+    pool = WorkerPool(processes=2, max_tasks_per_child=100, timeout=60)
+    try:
+        pool.map(_square, range(4))  # wait for both workers to start
+        results = []
+        other = threading.Thread(target=lambda: results.append(pool.map(_slow_square, [3])))
+        other.start()
+        time.sleep(0.2)
+
+        with pytest.raises(TimeoutError):
+            pool.map(time.sleep, [5], timeout=0.5)
+        other.join()
+        assert results == [[9]]
+        assert pool.restarts == 1
+        assert pool.stats()["maps_in_flight"] == 0
+        assert pool.map(_square, [4]) == [16]
+    finally:
+        pool.shutdown()